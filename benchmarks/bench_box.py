@@ -0,0 +1,166 @@
+"""Micro-benchmarks of Box creation and updates for every configured device.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_box
+    python -m benchmarks.bench_box --types switchBoxD multiSensor --number 5000
+
+For every device type and API level it reports ops/sec and peak memory
+allocated by a single operation of:
+
+* ``init`` - ``Box.__init__`` (features, extraction plan, first state)
+* ``features`` - ``Box.create_features``
+* ``update`` - ``Box._update_last_data`` with a changed state
+* ``update_same`` - ``Box._update_last_data`` with an unchanged state
+* ``after_update:<feature>`` - ``after_update`` of each feature
+
+No network is used: boxes are bound to a mocked aiohttp session the same way
+the test suite does it (see tests/conftest.py).
+"""
+
+import argparse
+import copy
+import json
+import sys
+import time
+import tracemalloc
+from typing import Callable, Iterator, NamedTuple, Optional
+from unittest.mock import AsyncMock
+
+from aiohttp import ClientSession
+
+from blebox_uniapi.box import Box
+from blebox_uniapi.session import ApiHost
+
+from .devices import RecordedDevice, recorded_devices
+
+DEFAULT_NUMBER = 1000
+
+
+class Result(NamedTuple):
+    type: str
+    level: int
+    operation: str
+    ops_per_sec: float
+    peak_bytes: int
+
+
+def _api_host() -> ApiHost:
+    session = AsyncMock(spec=ClientSession)
+    return ApiHost("172.0.0.1", 80, 2, session, None)
+
+
+def _peak_bytes(operation: Callable[[], object]) -> int:
+    """Return peak memory allocated while running operation once."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - start
+
+
+def _measure(
+    setup: Callable[[], tuple], operation: Callable, number: int
+) -> tuple[float, int]:
+    """Return ops/sec and peak allocation of operation(*setup()).
+
+    Setup runs outside of the timed section so operations may consume their
+    arguments (e.g. state that Box keeps a reference to).
+    """
+    arguments = [setup() for _ in range(number)]
+    elapsed = 0
+    for args in arguments:
+        start = time.perf_counter_ns()
+        operation(*args)
+        elapsed += time.perf_counter_ns() - start
+
+    args = setup()
+    peak = _peak_bytes(lambda: operation(*args))
+    return number / (elapsed / 1e9), peak
+
+
+def bench_device(device: RecordedDevice, number: int) -> Iterator[Result]:
+    api_host = _api_host()
+    config = Box._match_device_config(device.info)
+
+    def result(operation: str, measured: tuple[float, int]) -> Result:
+        return Result(device.type, device.level, operation, *measured)
+
+    # note: feature factories may modify extended state, so each call gets a copy
+    def box_args() -> tuple:
+        extended_state = copy.deepcopy(device.extended_state)
+        return api_host, device.info, config, extended_state
+
+    yield result("init", _measure(box_args, Box, number))
+
+    def features_args() -> tuple:
+        return config, device.info, copy.deepcopy(device.extended_state)
+
+    box = Box(*box_args())
+    yield result("features", _measure(features_args, box.create_features, number))
+
+    # note: every response is freshly decoded, so states are copied as well
+    states = device.states
+    box._update_last_data(copy.deepcopy(states[-1]))
+    turn = iter(range(sys.maxsize))
+
+    def next_state() -> tuple:
+        return (copy.deepcopy(states[next(turn) % len(states)]),)
+
+    yield result("update", _measure(next_state, box._update_last_data, number))
+
+    def same_state() -> tuple:
+        return (copy.deepcopy(box.last_data),)
+
+    box._update_last_data(copy.deepcopy(states[0]))
+    yield result("update_same", _measure(same_state, box._update_last_data, number))
+
+    for feature_set in box.features.values():
+        for feature in feature_set:
+            yield result(
+                f"after_update:{feature.alias}",
+                _measure(tuple, feature.after_update, number),
+            )
+
+
+def run(types: Optional[set] = None, number: int = DEFAULT_NUMBER) -> list[Result]:
+    results = []
+    for device in recorded_devices(types):
+        results.extend(bench_device(device, number))
+    return results
+
+
+def _print_table(results: list[Result]) -> None:
+    print(f"{'type':<16}{'level':<10}{'operation':<40}{'ops/sec':>14}{'peak B':>10}")
+    for item in results:
+        print(
+            f"{item.type:<16}{item.level:<10}{item.operation:<40}"
+            f"{item.ops_per_sec:>14,.0f}{item.peak_bytes:>10}"
+        )
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--types", nargs="*", help="only benchmark these box types")
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=DEFAULT_NUMBER,
+        help=f"operations per measurement (default: {DEFAULT_NUMBER})",
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(set(args.types or ()), args.number)
+    if args.json:
+        print(json.dumps([item._asdict() for item in results], indent=2))
+    else:
+        _print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Micro-benchmarks of JSON decoders on recorded device responses.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_decode
+
+Compares decoders available to ApiHost (see blebox_uniapi.decoder) on the
+state payload of every device type, reporting ops/sec per decoder. The
+``stdlib`` decoder is what ``ClientResponse.json()`` used to do on every poll.
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, NamedTuple, Optional
+
+from blebox_uniapi import decoder
+
+from .devices import recorded_devices
+
+DEFAULT_NUMBER = 10000
+
+
+class Result(NamedTuple):
+    type: str
+    size: int
+    decoder: str
+    ops_per_sec: float
+
+
+def decoders() -> dict[str, Callable[[bytes], object]]:
+    available = {"stdlib": decoder.stdlib_decoder}
+    if decoder.orjson is not None:
+        available["orjson"] = decoder.orjson_decoder
+    return available
+
+
+def _ops_per_sec(decode: Callable[[bytes], object], body: bytes, number: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        decode(body)
+    return number / ((time.perf_counter_ns() - start) / 1e9)
+
+
+def run(types: Optional[set] = None, number: int = DEFAULT_NUMBER) -> list[Result]:
+    bodies = {}
+    for device in recorded_devices(types):
+        # note: same payload is often recorded for many API levels of a type
+        bodies.setdefault(device.type, json.dumps(device.states[0]).encode())
+
+    return [
+        Result(box_type, len(body), name, _ops_per_sec(decode, body, number))
+        for box_type, body in bodies.items()
+        for name, decode in decoders().items()
+    ]
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--types", nargs="*", help="only benchmark these box types")
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=DEFAULT_NUMBER,
+        help=f"decodes per measurement (default: {DEFAULT_NUMBER})",
+    )
+    args = parser.parse_args(argv)
+
+    print(f"{'type':<16}{'bytes':>8}  {'decoder':<10}{'ops/sec':>14}")
+    for item in run(set(args.types or ()), args.number):
+        print(
+            f"{item.type:<16}{item.size:>8}  {item.decoder:<10}"
+            f"{item.ops_per_sec:>14,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
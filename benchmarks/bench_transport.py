@@ -0,0 +1,109 @@
+"""Micro-benchmarks of ApiHost transports against a local HTTP stand-in.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_transport
+
+The stand-in is a minimal keep-alive HTTP server on localhost answering every
+request with the recorded state of a device, so results show per-request
+client overhead of each transport rather than device latency.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import NamedTuple, Optional
+
+import aiohttp
+
+from blebox_uniapi.session import ApiHost
+from blebox_uniapi.transport import StreamTransport
+
+from .devices import recorded_devices
+
+DEFAULT_NUMBER = 2000
+
+
+class Result(NamedTuple):
+    transport: str
+    method: str
+    requests_per_sec: float
+
+
+async def _serve(body: bytes) -> asyncio.AbstractServer:
+    head = (
+        "HTTP/1.1 200 OK\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    ).encode()
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                for line in request.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        await reader.readexactly(int(line.split(b":")[1]))
+                writer.write(head + body)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def _requests_per_sec(api_host: ApiHost, method: str, number: int) -> float:
+    def request():
+        if method == "GET":
+            return api_host.async_api_get("/state/extended")
+        return api_host.async_api_post("/api/relay/set", '{"relays": []}')
+
+    # note: warm-up opens the kept-alive connection
+    await request()
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        await request()
+    return number / ((time.perf_counter_ns() - start) / 1e9)
+
+
+async def run(number: int = DEFAULT_NUMBER, box_type: str = "switchBoxD") -> list:
+    device = next(iter(recorded_devices({box_type})))
+    server = await _serve(json.dumps(device.states[0]).encode())
+    host, port = server.sockets[0].getsockname()[:2]
+
+    results = []
+    async with server:
+        async with aiohttp.ClientSession() as session:
+            transports = {"aiohttp": session, "stream": StreamTransport()}
+            for name, transport in transports.items():
+                api_host = ApiHost(host, port, 5, transport, None)
+                for method in ("GET", "POST"):
+                    rate = await _requests_per_sec(api_host, method, number)
+                    results.append(Result(name, method, rate))
+            await transports["stream"].close()
+    return results
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=DEFAULT_NUMBER,
+        help=f"requests per measurement (default: {DEFAULT_NUMBER})",
+    )
+    parser.add_argument(
+        "--type", default="switchBoxD", help="device type of served payload"
+    )
+    args = parser.parse_args(argv)
+
+    print(f"{'transport':<12}{'method':<8}{'requests/sec':>14}")
+    for item in asyncio.run(run(args.number, args.type)):
+        print(f"{item.transport:<12}{item.method:<8}{item.requests_per_sec:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
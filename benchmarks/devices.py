@@ -0,0 +1,373 @@
+"""Recorded payloads for every device type and API level in BOX_TYPE_CONF.
+
+Payloads are taken from the integration test suites (see tests/test_*.py) and
+from device captures. Each device has its extended state (used to create
+features) and two state snapshots returned by its state endpoint, so updates
+alternate between them and every feature has something to recompute.
+"""
+
+import copy
+from typing import Any, NamedTuple, Optional
+
+from blebox_uniapi.box_types import BOX_TYPE_CONF
+
+
+class RecordedDevice(NamedTuple):
+    type: str
+    level: int
+    info: dict
+    extended_state: Optional[Any]
+    states: tuple
+
+
+def _merged(base: Any, patch: Any) -> Any:
+    """Return deep copy of base with (nested) dict values replaced by patch."""
+    if not (isinstance(base, dict) and isinstance(patch, dict)):
+        return copy.deepcopy(patch)
+    result = copy.deepcopy(base)
+    for key, value in patch.items():
+        result[key] = _merged(result.get(key), value)
+    return result
+
+
+TV_LIFT = {"tvLift": {"controlType": 4}}
+
+AIR = {
+    "air": {
+        "sensors": [
+            {"type": "pm1", "value": 49, "trend": 3, "state": 0, "qualityLevel": 0},
+            {"type": "pm2.5", "value": 222, "trend": 1, "state": 0, "qualityLevel": 4},
+            {"type": "pm10", "value": 333, "trend": 0, "state": 0, "qualityLevel": 6},
+        ]
+    }
+}
+AIR_CHANGED = {
+    "air": {
+        "sensors": [
+            {"type": "pm1", "value": 12, "trend": 2, "state": 0, "qualityLevel": 0},
+            {"type": "pm2.5", "value": 30, "trend": 2, "state": 0, "qualityLevel": 1},
+            {"type": "pm10", "value": 41, "trend": 2, "state": 0, "qualityLevel": 1},
+        ]
+    }
+}
+
+DIMMER = {
+    "dimmer": {
+        "loadType": 7,
+        "currentBrightness": 11,
+        "desiredBrightness": 53,
+        "temperature": 29,
+        "overloaded": False,
+        "overheated": False,
+    }
+}
+DIMMER_CHANGED = _merged(
+    DIMMER, {"dimmer": {"currentBrightness": 53, "desiredBrightness": 0}}
+)
+
+GATE = {
+    "currentPos": 50,
+    "desiredPos": 50,
+    "extraButtonType": 1,
+    "extraButtonRelayNumber": 1,
+    "extraButtonPulseTimeMs": 800,
+    "extraButtonInvert": 1,
+    "gateType": 0,
+    "gateRelayNumber": 0,
+    "gatePulseTimeMs": 800,
+    "gateInvert": 0,
+    "inputsType": 1,
+    "openLimitSwitchInputNumber": 0,
+    "closeLimitSwitchInputNumber": 1,
+}
+GATE_CHANGED = _merged(GATE, {"currentPos": 20, "desiredPos": 100})
+
+GATE_B = {
+    "gate": {
+        "currentPos": 0,
+        "openCloseMode": 0,
+        "gateType": 1,
+        "gatePulseTimeMs": 1500,
+        "gateOutputState": 0,
+        "extraButtonType": 1,
+        "extraButtonPulseTimeMs": 1500,
+        "extraButtonOutputState": 0,
+        "inputsType": 0,
+    }
+}
+GATE_B_CHANGED = _merged(GATE_B, {"gate": {"currentPos": 60, "gateOutputState": 1}})
+
+GATE_CONTROLLER = {
+    "gateController": {
+        "state": 2,
+        "safety": {"eventReason": 0, "triggered": [0]},
+        "currentPos": {"positions": [31]},
+        "desiredPos": {"positions": [29]},
+    }
+}
+GATE_CONTROLLER_CHANGED = _merged(
+    GATE_CONTROLLER,
+    {"gateController": {"state": 1, "currentPos": {"positions": [70]}}},
+)
+
+THERMO = {
+    "thermo": {
+        "state": 0,
+        "operatingState": 3,
+        "desiredTemp": -70,
+        "mode": 2,
+        "minimumTemp": -1230,
+        "maximumTemp": 6000,
+        "safety": {"eventReason": 0, "triggered": []},
+        "safetyTempSensor": {"sensorId": 1},
+    },
+    "sensors": [
+        {"id": 0, "type": "temperature", "value": 2098, "state": 2},
+        {"id": 1, "type": "temperature", "value": 2775, "state": 2},
+    ],
+}
+THERMO_CHANGED = _merged(
+    THERMO, {"thermo": {"state": 1, "operatingState": 1, "desiredTemp": 2200}}
+)
+
+SAUNA = {
+    "heat": {
+        "state": 0,
+        "desiredTemp": 6428,
+        "maximumTemp": 12166,
+        "minimumTemp": -5166,
+        "sensors": [
+            {
+                "type": "temperature",
+                "id": 0,
+                "value": 3996,
+                "trend": 0,
+                "state": 2,
+                "elapsedTimeS": 0,
+            }
+        ],
+    }
+}
+SAUNA_CHANGED = _merged(SAUNA, {"heat": {"state": 1, "desiredTemp": 7000}})
+
+SHUTTER = {
+    "shutter": {
+        "state": 2,
+        "currentPos": {"position": 34, "tilt": 3},
+        "desiredPos": {"position": 78, "tilt": 97},
+        "favPos": {"position": 13, "tilt": 17},
+    }
+}
+SHUTTER_EXTENDED = _merged(SHUTTER, {"shutter": {"controlType": 3}})
+SHUTTER_CHANGED = _merged(
+    SHUTTER,
+    {"shutter": {"state": 0, "desiredPos": {"position": 12, "tilt": 50}}},
+)
+
+RELAYS = {"relays": [{"relay": 0, "state": 0, "stateAfterRestart": 0}]}
+RELAYS_CHANGED = {"relays": [{"relay": 0, "state": 1, "stateAfterRestart": 0}]}
+
+POWER_MEASURING = {
+    "powerMeasuring": {
+        "enabled": 1,
+        "powerConsumption": [{"periodS": 86400, "value": 0.5}],
+    },
+    "sensors": [{"type": "activePower", "id": 0, "value": 12}],
+}
+POWER_MEASURING_CHANGED = {
+    "powerMeasuring": {
+        "enabled": 1,
+        "powerConsumption": [{"periodS": 86400, "value": 0.75}],
+    },
+    "sensors": [{"type": "activePower", "id": 0, "value": 1840}],
+}
+
+SWITCH = {**RELAYS, **POWER_MEASURING}
+SWITCH_CHANGED = {**RELAYS_CHANGED, **POWER_MEASURING_CHANGED}
+
+SWITCH_D = {
+    "relays": [
+        {"relay": 0, "state": 0, "stateAfterRestart": 0, "name": "output 1"},
+        {"relay": 1, "state": 0, "stateAfterRestart": 0, "name": "output 2"},
+    ],
+    **POWER_MEASURING,
+}
+SWITCH_D_CHANGED = _merged(
+    SWITCH_D,
+    {
+        "relays": [
+            {"relay": 0, "state": 1, "stateAfterRestart": 0, "name": "output 1"},
+            {"relay": 1, "state": 0, "stateAfterRestart": 0, "name": "output 2"},
+        ],
+        **POWER_MEASURING_CHANGED,
+    },
+)
+
+TEMP_SENSOR = {
+    "tempSensor": {
+        "sensors": [
+            {
+                "type": "temperature",
+                "id": 0,
+                "value": 2518,
+                "trend": 3,
+                "state": 2,
+                "elapsedTimeS": 0,
+            }
+        ]
+    }
+}
+TEMP_SENSOR_CHANGED = {
+    "tempSensor": {
+        "sensors": [
+            {
+                "type": "temperature",
+                "id": 0,
+                "value": 2475,
+                "trend": 1,
+                "state": 2,
+                "elapsedTimeS": 0,
+            }
+        ]
+    }
+}
+
+RGBW = {
+    "rgbw": {
+        "colorMode": 4,
+        "effectID": 0,
+        "desiredColor": "fa00203A",
+        "currentColor": "ff00302F",
+        "lastOnColor": "f1e2d3e4",
+        "durationsMs": {"colorFade": 1000, "effectFade": 1500, "effectStep": 2000},
+        "favColors": {"0": "ff", "1": "00", "2": "c0", "3": "40", "4": "00"},
+        "effectsNames": {"0": "NONE", "1": "FADE", "2": "Stroboskop", "3": "BELL"},
+    }
+}
+RGBW_CHANGED = _merged(
+    RGBW, {"rgbw": {"desiredColor": "00000000", "currentColor": "10203040"}}
+)
+
+MONO = {
+    "rgbw": {
+        "desiredColor": "f5",
+        "currentColor": "f5",
+        "lastOnColor": "f5",
+        "durationsMs": {"colorFade": 1000, "effectFade": 1000, "effectStep": 1000},
+        "effectID": 0,
+        "colorMode": 3,
+        "favColors": {"0": "ff", "1": "00", "2": "c0", "3": "40", "4": "00"},
+        "effectsNames": {"0": "NONE", "1": "FADE", "2": "Stroboskop", "3": "BELL"},
+    }
+}
+MONO_CHANGED = _merged(MONO, {"rgbw": {"desiredColor": "00", "currentColor": "40"}})
+
+LIGHT = {"light": {"desiredColor": "ab", "currentColor": "cd", "fadeSpeed": 255}}
+LIGHT_CHANGED = {"light": {"desiredColor": "00", "currentColor": "ab", "fadeSpeed": 255}}
+
+# note: multiSensor levels support different sensor types, so each level gets
+# the subset of these its config knows about
+MULTI_SENSORS = (
+    {"type": "temperature", "id": 0, "value": 3606, "trend": 2, "state": 2},
+    {"type": "temperature", "id": 1, "value": 4712, "trend": 3, "state": 2},
+    {"type": "humidity", "id": 2, "value": 4550, "trend": 0, "state": 2},
+    {"type": "wind", "id": 3, "value": 42, "trend": 1, "state": 2},
+    {"type": "illuminance", "id": 4, "value": 1250000, "trend": 0, "state": 2},
+    {"type": "rain", "id": 5, "value": 0, "trend": 0, "state": 2},
+    {"type": "flood", "id": 6, "value": 0, "trend": 0, "state": 2},
+    {"type": "voltage", "id": 7, "value": 2301, "trend": 0, "state": 2},
+    {"type": "current", "id": 7, "value": 1520, "trend": 0, "state": 2},
+    {"type": "frequency", "id": 7, "value": 50012, "trend": 0, "state": 2},
+    {"type": "activePower", "id": 7, "value": 312, "trend": 0, "state": 2},
+    {"type": "apparentPower", "id": 7, "value": 340, "trend": 0, "state": 2},
+    {"type": "reactivePower", "id": 7, "value": 28, "trend": 0, "state": 2},
+    {"type": "forwardActiveEnergy", "id": 7, "value": 1700, "trend": 0, "state": 2},
+    {"type": "reverseActiveEnergy", "id": 7, "value": 3, "trend": 0, "state": 2},
+)
+
+
+def _multi_sensor(config: dict, changed: bool = False) -> dict:
+    supported = set()
+    for field in ("sensors", "binary_sensors"):
+        for _, methods in config.get(field, []):
+            supported.update(methods)
+
+    sensors = []
+    for sensor in MULTI_SENSORS:
+        if sensor["type"] not in supported:
+            continue
+        sensor = dict(sensor)
+        if changed:
+            sensor["value"] += 1
+        sensors.append(sensor)
+    return {"multiSensor": {"sensors": sensors}}
+
+
+# (extended state, state, changed state) per device type, or per API level
+# where the state shape differs between levels
+PAYLOADS = {
+    "tvLiftBox": (TV_LIFT, TV_LIFT, TV_LIFT),
+    "airSensor": (None, AIR, AIR_CHANGED),
+    "dimmerBox": (None, DIMMER, DIMMER_CHANGED),
+    ("gateBox", 20151206): (None, GATE, GATE_CHANGED),
+    ("gateBox", 20200831): (GATE_B, GATE_B, GATE_B_CHANGED),
+    "gateController": (GATE_CONTROLLER, GATE_CONTROLLER, GATE_CONTROLLER_CHANGED),
+    "thermoBox": (THERMO, THERMO, THERMO_CHANGED),
+    "saunaBox": (SAUNA, SAUNA, SAUNA_CHANGED),
+    "shutterBox": (SHUTTER_EXTENDED, SHUTTER, SHUTTER_CHANGED),
+    ("switchBox", 20180604): (
+        RELAYS,
+        RELAYS["relays"],
+        RELAYS_CHANGED["relays"],
+    ),
+    "switchBox": (SWITCH, SWITCH, SWITCH_CHANGED),
+    "switchBoxD": (SWITCH_D, SWITCH_D, SWITCH_D_CHANGED),
+    "tempSensor": (None, TEMP_SENSOR, TEMP_SENSOR_CHANGED),
+    ("wLightBox", 20151206): (None, RGBW, RGBW_CHANGED),
+    "wLightBox": (RGBW, RGBW, RGBW_CHANGED),
+    ("wLightBoxS", 20151206): (None, LIGHT, LIGHT_CHANGED),
+    ("wLightBoxS", 20180718): (None, LIGHT, LIGHT_CHANGED),
+    "wLightBoxS": (MONO, MONO, MONO_CHANGED),
+}
+
+
+def _info(box_type: str, level: int) -> dict:
+    info = {
+        "deviceName": f"My {box_type}",
+        "type": box_type,
+        "fv": "0.993",
+        "hv": "0.7",
+        "apiLevel": str(level),
+        "id": f"{box_type.lower()}{level}",
+        "ip": "172.0.0.1",
+    }
+    if box_type == "wLightBoxS" and level >= 20200229:
+        # note: since then wLightBoxS reports itself as wLightBox product variant
+        info.update(type="wLightBox", product="wLightBoxS")
+    return info
+
+
+def recorded_devices(types: Optional[set] = None) -> list:
+    """Return RecordedDevice for every type and API level in BOX_TYPE_CONF."""
+    devices = []
+    for box_type, conf_set in BOX_TYPE_CONF.items():
+        if types and box_type not in types:
+            continue
+        for level, config in conf_set.items():
+            if box_type == "multiSensor":
+                extended_state = _multi_sensor(config)
+                states = (extended_state, _multi_sensor(config, changed=True))
+            else:
+                payloads = PAYLOADS.get((box_type, level)) or PAYLOADS[box_type]
+                extended_state, *states = payloads
+
+            devices.append(
+                RecordedDevice(
+                    type=box_type,
+                    level=level,
+                    info=_info(box_type, level),
+                    extended_state=extended_state,
+                    states=tuple(states),
+                )
+            )
+    return devices
@@ -9,6 +9,8 @@ if TYPE_CHECKING:
 class BinarySensor(Feature):
     """Class representing sensor with bool state."""
 
+    state_attributes = ("state",)
+
     def __init__(self, product: "Box", alias: str, methods: dict):
         super().__init__(product, alias, methods)
 
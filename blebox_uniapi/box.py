@@ -3,16 +3,22 @@ from __future__ import annotations
 import asyncio
 import time
 
-from typing import Optional, Any, Dict
+from collections.abc import Mapping
+from typing import Optional, Any, Callable, Dict, Iterable
 
 from .box_types import _DEFAULT_API_LEVEL, get_conf, get_conf_set
 from .button import Button
 from .climate import Climate
 from .cover import Cover
+from .jfollow import ExtractionPlan, Extractor, StateIndex, path_root
 from .light import Light
+from .metrics import ProbeTimings, SkipStats
+from .polling import PollingPolicy
+from .ratelimit import RateLimits
 from .sensor import SensorFactory
 from .binary_sensor import BinarySensor
 from .session import ApiHost
+from .state import LayeredState
 from .switch import Switch
 
 from .error import (
@@ -24,18 +30,22 @@ from .error import (
     BadFieldNotANumber,
     BadFieldNotAString,
     BadFieldNotRGBW,
+    Error,
     HttpError,
 )
 
 
 DEFAULT_PORT = 80
+# note: seconds for which state is reused instead of polling the device again
+RECENT_DATA_WINDOW = 2
 
 
 class Box:
     _name: str
     _data_path: str
     _last_real_update: Optional[float]
-    _last_data: Optional[Any]
+    _last_data: Optional[Any]  # dict, list or LayeredState
+    _extracted: Dict[str, Any]
 
     api_session: ApiHost
     info: dict
@@ -48,8 +58,22 @@ class Box:
         info,
         config,
         extended_state,
+        *,
+        lazy_updates: bool = False,
+        coalesce_commands: bool = False,
+        polling_policy: Optional[PollingPolicy] = None,
     ) -> None:
+        self._lazy_updates = lazy_updates
+        self._polling_policy = polling_policy
+        self._coalesce_commands = coalesce_commands
         self._last_data = None
+        self._extracted = {}
+        self._index = StateIndex(None)
+        self._failed_features: set = set()
+        self._last_response = None
+        self._updates = 0
+        self._skipped_updates = 0
+        self._probe_timings: Optional[ProbeTimings] = None
         self._last_real_update = None
         self._sem = asyncio.BoundedSemaphore()
         self._session = api_session
@@ -107,6 +131,8 @@ class Box:
 
         level = int(info.get("apiLevel", _DEFAULT_API_LEVEL))
 
+        self._info = info
+        self._extended_state = extended_state
         self._data_path = config["api_path"]
         self._type = type
         self._unique_id = unique_id
@@ -118,6 +144,8 @@ class Box:
         self._model = config.get("model", type)
         self._api = config.get("api", {})
         self._features = self.create_features(config, info, extended_state)
+        self._plan = self.create_extraction_plan(self._features)
+        self._dependencies = self.create_feature_dependencies(self._features)
         self._config = config
         self._update_last_data(extended_state)
 
@@ -145,25 +173,146 @@ class Box:
                 raise UnsupportedBoxResponse("Failed to initialize:", info)
         return features
 
+    @staticmethod
+    def create_extraction_plan(features: dict) -> ExtractionPlan:
+        plan = ExtractionPlan()
+        for feature_set in features.values():
+            for feature in feature_set:
+                for name, path in feature.access_paths.items():
+                    plan.add(path, feature.extractors[name])
+        return plan
+
+    @staticmethod
+    def create_feature_dependencies(features: dict) -> list:
+        """Return (feature, top-level keys it reads) pairs, None meaning any key."""
+        dependencies = []
+        for feature_set in features.values():
+            for feature in feature_set:
+                roots = {path_root(path) for path in feature.access_paths.values()}
+                dependencies.append((feature, None if None in roots else roots))
+        return dependencies
+
+    @staticmethod
+    def _changed_roots(
+        old_data: Any, new_data: Any, partial: bool = False
+    ) -> Optional[set]:
+        """Return top-level keys that differ between states, None meaning all."""
+        if old_data is None or new_data is None:
+            return None
+        if not (isinstance(old_data, Mapping) and isinstance(new_data, Mapping)):
+            return set() if old_data == new_data else None
+
+        missing = object()
+        changed = {
+            key
+            for key, value in new_data.items()
+            if (old := old_data.get(key, missing)) is not value and old != value
+        }
+        if not partial:
+            changed.update(key for key in old_data if key not in new_data)
+        return changed
+
     @classmethod
-    async def async_from_host(cls, api_host: ApiHost) -> Box:
-        try:
-            path = "/api/device/state"
-            data = await api_host.async_api_get(path)
-        except HttpError:
-            path = "/info"
-            data = await api_host.async_api_get(path)
-        info = data.get("device", data)  # type: ignore
+    async def async_from_host(
+        cls,
+        api_host: ApiHost,
+        *,
+        lazy_updates: bool = False,
+        coalesce_commands: bool = False,
+        rate_limits: Optional[RateLimits] = None,
+        hedged: bool = False,
+        polling_policy: Optional[PollingPolicy] = None,
+    ) -> Box:
+        """Create box of device at api_host.
+
+        With ``hedged``, device state and /info are probed at once (see
+        async_get_info), so legacy devices don't wait for the state probe
+        to fail first. Durations of the stages are kept in probe_timings.
+        """
+        started = time.monotonic()
+        info_path, info = await cls._async_probe_info(api_host, hedged)
+        probed = time.monotonic()
         extended_state = None
 
         config = cls._match_device_config(info)
+        if rate_limits is not None and api_host.rate_limiter is None:
+            api_host.rate_limiter = rate_limits.bucket(info["type"])
         if extended_state_path := config.get("extended_state_path"):
             try:
                 extended_state = await api_host.async_api_get(extended_state_path)
             except (HttpError, KeyError):
                 extended_state = None
 
-        return cls(api_host, info, config, extended_state)
+        fetched = time.monotonic()
+        box = cls(
+            api_host,
+            info,
+            config,
+            extended_state,
+            lazy_updates=lazy_updates,
+            coalesce_commands=coalesce_commands,
+            polling_policy=polling_policy,
+        )
+        box._probe_timings = ProbeTimings(
+            info=probed - started,
+            extended_state=fetched - probed,
+            total=fetched - started,
+            info_path=info_path,
+        )
+        return box
+
+    @classmethod
+    async def async_get_info(cls, api_host: ApiHost, hedged: bool = False) -> dict:
+        """Return device info, from its state (newer API) or /info (legacy).
+
+        Probes are sent one after another, unless ``hedged``: then both are
+        sent at once and the first valid answer is used (the other probe is
+        cancelled).
+        """
+        return (await cls._async_probe_info(api_host, hedged))[1]
+
+    @staticmethod
+    async def _async_probe_info(api_host: ApiHost, hedged: bool) -> tuple[str, dict]:
+        if not hedged:
+            try:
+                path = "/api/device/state"
+                data = await api_host.async_api_get(path)
+            except HttpError:
+                path = "/info"
+                data = await api_host.async_api_get(path)
+            return path, data.get("device", data)  # type: ignore
+
+        paths = ("/api/device/state", "/info")
+        probes = {asyncio.ensure_future(api_host.async_api_get(p)): p for p in paths}
+        errors: Dict[str, Exception] = {}
+        pending = set(probes)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # note: device state wins if both answered meanwhile
+                for probe in sorted(done, key=lambda probe: paths.index(probes[probe])):
+                    path = probes[probe]
+                    try:
+                        data = probe.result()
+                    except Error as ex:
+                        errors[path] = ex
+                        continue
+                    if isinstance(data, dict):
+                        return path, data.get("device", data)
+                    errors[path] = UnsupportedBoxResponse(
+                        f"Unexpected response from {path}: {data!r}"
+                    )
+        finally:
+            for probe in probes:
+                probe.cancel()
+            await asyncio.gather(*probes, return_exceptions=True)
+
+        # note: same as without hedging, /info is only relevant if device state
+        #       isn't supported at all
+        state_error = errors["/api/device/state"]
+        raise errors["/info"] if isinstance(state_error, HttpError) else state_error
 
     @classmethod
     def _match_device_config(cls, info: dict) -> dict:
@@ -193,12 +342,22 @@ class Box:
     def name(self) -> str:
         return self._name
 
+    @property
+    def info(self) -> dict:
+        """Device info the box was created from."""
+        return self._info
+
+    @property
+    def extended_state(self) -> Optional[dict]:
+        """Extended state the box (and its features) was created from."""
+        return self._extended_state
+
     @property
     def address(self) -> str:
         return self._address
 
     @property
-    def last_data(self) -> Optional[Dict[Any, Any]]:
+    def last_data(self) -> Optional[Mapping]:
         return self._last_data
 
     # Used in full_name, track down and refactor.
@@ -222,6 +381,59 @@ class Box:
     def api_version(self) -> int:
         return self._api_version
 
+    def subscribe(self, callback: Callable[[Any, dict], Any]) -> Callable[[], None]:
+        """Call callback(feature, changes) when state of any feature changes.
+
+        See Feature.subscribe for details. Returns function that cancels the
+        subscription.
+        """
+        unsubscribers = [
+            feature.subscribe(callback)
+            for feature_set in self._features.values()
+            for feature in feature_set
+        ]
+
+        def unsubscribe() -> None:
+            for unsubscribe_feature in unsubscribers:
+                unsubscribe_feature()
+
+        return unsubscribe
+
+    @property
+    def lazy_updates(self) -> bool:
+        """Whether features derive their attributes on read instead of on update."""
+        return self._lazy_updates
+
+    @property
+    def coalesce_commands(self) -> bool:
+        """Whether features send only the latest of rapidly issued values."""
+        return self._coalesce_commands
+
+    @property
+    def polling_policy(self) -> Optional[PollingPolicy]:
+        return self._polling_policy
+
+    @property
+    def poll_interval(self) -> float:
+        """Seconds for which state of the box is fresh enough for its features.
+
+        Fixed 2 seconds without polling policy, otherwise interval of the
+        most demanding feature in its current state (see PollingPolicy).
+        """
+        if self._polling_policy is None:
+            return RECENT_DATA_WINDOW
+        return self._polling_policy.box_interval(self)
+
+    @property
+    def probe_timings(self) -> Optional[ProbeTimings]:
+        """Stage durations of async_from_host, if the box was created by it."""
+        return self._probe_timings
+
+    @property
+    def skipped_updates(self) -> SkipStats:
+        """State updates received and those skipped as identical to last one."""
+        return SkipStats(self._updates, self._skipped_updates)
+
     @property
     def features(self) -> dict:
         return self._features
@@ -238,6 +450,20 @@ class Box:
         await self._async_api(True, "GET", self._data_path)
 
     def _update_last_data(self, new_data: Optional[dict]) -> None:
+        # note: ApiHost returns the same object for byte-identical responses,
+        #       so nothing has changed since the last update
+        self._updates += 1
+        if (
+            new_data is not None
+            and new_data is self._last_response
+            and not self._failed_features
+        ):
+            self._skipped_updates += 1
+            return
+        self._last_response = new_data
+
+        old_data = self._last_data
+
         # Note: on certain more complex devices that inlcude multiple features
         # like switches and sensors (e.g. SwitchboxD) it may happen that activating
         # single feature would result only in partial update of the self._last_data.
@@ -251,11 +477,15 @@ class Box:
         #
         # Note that SwitchboxD is just an example. It is possible that APIs of other
         # box types also exhibit this kind of behavior.
-        if (
-            isinstance(self._last_data, dict)
+        partial = (
+            isinstance(old_data, Mapping)
             and isinstance(new_data, dict)
-            and self._last_data.keys() != new_data.keys()
-        ):
+            and old_data.keys() != new_data.keys()
+        )
+        # Only features reading changed parts of the state need to be updated,
+        # which in steady state (polling unchanged device) means none of them.
+        changed = self._changed_roots(old_data, new_data, partial)
+        if partial:
             # ... In such a case we need to merge both states instead of overwriting
             # the old one as-is.
             #
@@ -268,12 +498,56 @@ class Box:
             # Refs:
             # - https://github.com/blebox/blebox_uniapi/pull/152
             # - https://github.com/blebox/blebox_uniapi/issues/137
-            new_data = {**self._last_data, **new_data}
+            #
+            # Note: merged state is layered (see LayeredState) so high rate of
+            # partial responses doesn't copy the whole state for each of them.
+            new_data = LayeredState.merge(old_data, new_data)
 
         self._last_data = new_data
-        for feature_set in self._features.values():
-            for feature in feature_set:
-                feature.after_update()
+        self._index = StateIndex(new_data)
+        if changed is None:
+            self._extracted = self._plan.evaluate(new_data, self._index)
+            self._dispatch_update(feature for feature, _ in self._dependencies)
+            return
+
+        if changed:
+            self._extracted.update(self._plan.evaluate(new_data, self._index, changed))
+        elif not self._failed_features:
+            return
+
+        self._dispatch_update(
+            feature
+            for feature, roots in self._dependencies
+            if feature in self._failed_features
+            or (changed and (roots is None or not roots.isdisjoint(changed)))
+        )
+
+    def _dispatch_update(self, features: Iterable) -> None:
+        """Update features, raising the first error after all were updated.
+
+        Features that failed (e.g. on invalid value reported by the device) are
+        updated again with the next state even if their part of it didn't
+        change, so the error keeps being reported instead of leaving them stale.
+        """
+        failed = set()
+        first_error = None
+        for feature in list(features):
+            try:
+                feature.handle_update()
+            except Exception as ex:
+                failed.add(feature)
+                if first_error is None:
+                    first_error = ex
+        self._failed_features = failed
+        if first_error is not None:
+            raise first_error
+
+    def extract(self, path: str, extractor: Extractor) -> Any:
+        """Return value of path in last data, precomputed by the extraction plan."""
+        try:
+            return self._extracted[path]
+        except KeyError:
+            return extractor(self._last_data, self._index)
 
     async def async_api_command(self, command: str, value: Any = None) -> None:
         method, *args = self._api[command](value)
@@ -340,7 +614,7 @@ class Box:
 
     def _has_recent_data(self) -> bool:
         last = self._last_real_update
-        return (time.time() - 2) <= last if last is not None else False
+        return (time.time() - self.poll_interval) <= last if last is not None else False
 
     async def _async_api(
         self,
@@ -361,7 +635,10 @@ class Box:
                 if self._has_recent_data():
                     return
             if method == "GET":
-                response = await self._session.async_api_get(path)
+                # note: commands may be sent with GET too (e.g. /s/p)
+                response = await self._session.async_api_get(
+                    path, idempotent=is_update
+                )
             else:
                 response = await self._session.async_api_post(path, post_data)
             self._update_last_data(response)
@@ -1,10 +1,23 @@
 from .sensor import Temperature
 from typing import Optional, Any, Union
-from .feature import Feature
+from .feature import Feature, synced_property
 from blebox_uniapi.jfollow import follow
 
 
 class Climate(Temperature):
+    supports_lazy_update = True
+    state_attributes = (
+        "is_on",
+        "desired",
+        "current",
+        "min_temp",
+        "max_temp",
+        "is_heating",
+        "is_cooling",
+        "hvac_action",
+    )
+    coalesced_commands = ("set",)
+
     _is_on: Optional[bool]
     _desired: Union[float, int, None]
     _is_heating: Optional[bool]
@@ -17,40 +30,48 @@ class Climate(Temperature):
     def __init__(self, product, alias, methods, mode):
         super().__init__(product, alias, methods)
         self._mode = mode
+        self._is_on = None
+        self._desired = None
+        self._current = None
+        self._is_heating = None
+        self._is_cooling = None
+        self._havc_action = None
+        self._min_temp = None
+        self._max_temp = None
 
     @property
     def mode(self) -> Optional[int]:
         return self._mode
 
-    @property
+    @synced_property
     def is_on(self) -> Optional[bool]:
         return self._is_on
 
-    @property
+    @synced_property
     def desired(self) -> Any:
         return self._desired
 
-    @property
+    @synced_property
     def current(self) -> Any:
         return self._current
 
-    @property
+    @synced_property
     def max_temp(self) -> Union[float, int, None]:
         return self._max_temp
 
-    @property
+    @synced_property
     def min_temp(self) -> Union[float, int, None]:
         return self._min_temp
 
-    @property
+    @synced_property
     def is_heating(self) -> Optional[bool]:
         return self._is_heating
 
-    @property
+    @synced_property
     def is_cooling(self) -> Optional[bool]:
         return self._is_cooling
 
-    @property
+    @synced_property
     def hvac_action(self) -> Optional[int]:
         return self._havc_action
 
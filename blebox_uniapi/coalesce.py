@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+
+class CommandCoalescer:
+    """Sends rapidly issued values of a single command one at a time.
+
+    While a command is in flight, newly submitted values replace the queued
+    one (last write wins), so e.g. dragging a slider sends the value in flight
+    and then only the latest one instead of every intermediate value.
+
+    Every caller awaits until its intent is satisfied: when its own value or
+    a newer one replacing it has been sent. If that send fails, all callers
+    waiting for it get the error.
+    """
+
+    def __init__(self, send: Callable[..., Awaitable[Any]]):
+        self._send = send
+        self._pending: Optional[tuple[tuple, dict, list]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.superseded = 0
+
+    async def submit(self, *args: Any, **kwargs: Any) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        if self._pending is None:
+            self._pending = (args, kwargs, [waiter])
+        else:
+            self.superseded += 1
+            self._pending = (args, kwargs, self._pending[2] + [waiter])
+
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._drain())
+        await waiter
+
+    async def _drain(self) -> None:
+        try:
+            while self._pending is not None:
+                args, kwargs, waiters = self._pending
+                self._pending = None
+                try:
+                    await self._send(*args, **kwargs)
+                except asyncio.CancelledError:
+                    self._pending = (args, kwargs, waiters)
+                    raise
+                except Exception as ex:
+                    self._resolve(waiters, ex)
+                else:
+                    self.sent += 1
+                    self._resolve(waiters)
+        except asyncio.CancelledError:
+            if self._pending is not None:
+                for waiter in self._pending[2]:
+                    waiter.cancel()
+                self._pending = None
+            raise
+        finally:
+            self._task = None
+
+    @staticmethod
+    def _resolve(waiters: list, ex: Optional[Exception] = None) -> None:
+        for waiter in waiters:
+            # note: caller may have been cancelled in the meantime
+            if waiter.done():
+                continue
+            if ex is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(ex)
@@ -1,7 +1,7 @@
 from enum import IntEnum, auto
 
 from .error import MisconfiguredDevice
-from .feature import Feature
+from .feature import Feature, synced_property
 from typing import TYPE_CHECKING, Any, Optional, Type, TypeVar
 
 if TYPE_CHECKING:
@@ -278,6 +278,10 @@ GateT = TypeVar("GateT", bound=Gate)
 
 # TODO: handle tilt
 class Cover(Feature):
+    supports_lazy_update = True
+    state_attributes = ("current", "state", "tilt_current", "has_stop", "cover_type")
+    coalesced_commands = ("position", "tilt")
+
     _desired: Optional[int]
     _state: Optional[BleboxCoverState]
     _has_stop: Optional[bool]
@@ -300,6 +304,10 @@ class Cover(Feature):
 
         self._device_class = dev_class
         self._attributes: GateT = subclass(control_type)
+        self._desired = None
+        self._state = None
+        self._has_stop = None
+        self._cover_type = None
         self._tilt_current = None
         super().__init__(product, alias, methods)
 
@@ -309,15 +317,15 @@ class Cover(Feature):
     ) -> list["Feature"]:
         return [cls(product, *args, extended_state) for args in box_type_config]
 
-    @property
+    @synced_property
     def current(self) -> Any:
         return self._desired
 
-    @property
+    @synced_property
     def state(self) -> Any:
         return self._state
 
-    @property
+    @synced_property
     def tilt_current(self):
         return self._tilt_current
 
@@ -329,11 +337,11 @@ class Cover(Feature):
     def has_tilt(self) -> bool:
         return self._attributes.has_tilt
 
-    @property
+    @synced_property
     def has_stop(self) -> bool:
         return self._has_stop
 
-    @property
+    @synced_property
     def cover_type(self) -> Optional[UnifiedCoverType]:
         return self._cover_type
 
@@ -344,7 +352,7 @@ class Cover(Feature):
         await self.async_api_command(self._attributes.close_command)
 
     async def async_stop(self) -> None:
-        await self.async_api_command(self._attributes.stop_command(self._has_stop))
+        await self.async_api_command(self._attributes.stop_command(self.has_stop))
 
     async def async_set_position(self, value: Any) -> None:
         if not self.is_slider:
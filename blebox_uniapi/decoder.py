@@ -0,0 +1,34 @@
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# note: decoder takes raw response body and raises ValueError if it isn't
+#       valid JSON (both json.JSONDecodeError and orjson.JSONDecodeError do)
+Decoder = Callable[[bytes], Any]
+
+
+def stdlib_decoder(body: bytes) -> Any:
+    # note: devices always respond with UTF-8, decoding it upfront is faster
+    #       than encoding detection done by json.loads() for bytes
+    return json.loads(body.decode("utf-8"))
+
+
+def orjson_decoder(body: bytes) -> Any:
+    if orjson is None:
+        raise RuntimeError("orjson is not installed")  # pragma: no cover
+    return orjson.loads(body)
+
+
+# note: orjson is optional (pip install blebox_uniapi[fast])
+DEFAULT_DECODER: Decoder = orjson_decoder if orjson is not None else stdlib_decoder
+
+
+def decode_json(body: bytes, decoder: Decoder = DEFAULT_DECODER) -> Any:
+    """Return decoded body or None if it is empty (same as aiohttp)."""
+    if not body or body.isspace():
+        return None
+    return decoder(body)
@@ -0,0 +1,192 @@
+"""Persistent cache of device descriptors for instant startup.
+
+Creating a box needs device info and extended state, which takes two or three
+requests per device. DescriptorCache stores both on disk by host, so on next
+start boxes are created without any request and only revalidated in the
+background: if the device reports other type, API level or firmware version
+(fingerprint) than the cached one, its entry is dropped and the box has to be
+created again.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, NamedTuple, Optional, Union
+
+from . import error
+from .box import Box
+from .ratelimit import RateLimits
+from .box_types import _DEFAULT_API_LEVEL
+from .session import ApiHost
+
+CACHE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(info: dict) -> tuple:
+    """Return (type, apiLevel, fv) of device info, which select box config."""
+    return (
+        info.get("type"),
+        str(info.get("apiLevel", _DEFAULT_API_LEVEL)),
+        info.get("fv"),
+    )
+
+
+class Descriptor(NamedTuple):
+    info: dict
+    extended_state: Optional[dict]
+
+    @property
+    def fingerprint(self) -> tuple:
+        return fingerprint(self.info)
+
+
+class DescriptorCache:
+    """Device info and extended state by host, stored in a JSON file.
+
+    Missing or unreadable file is treated as empty cache. Changes are
+    written to the file (atomically) by save().
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self._path = Path(path)
+        self._entries: dict[str, Descriptor] = {}
+        self._revalidations: dict[str, asyncio.Task] = {}
+        self._load()
+
+    @staticmethod
+    def key(api_host: ApiHost) -> str:
+        return f"{api_host.host}:{api_host.port}"
+
+    def _load(self) -> None:
+        try:
+            with self._path.open(encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as ex:
+            logger.warning(f"Ignoring unreadable descriptor cache {self._path}: {ex}")
+            return
+
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            logger.warning(f"Ignoring descriptor cache {self._path} of other version")
+            return
+        for key, entry in data.get("devices", {}).items():
+            descriptor = Descriptor(entry["info"], entry.get("extended_state"))
+            # note: entries are only used if they still match their fingerprint
+            if list(descriptor.fingerprint) == entry.get("fingerprint"):
+                self._entries[key] = descriptor
+
+    def save(self) -> None:
+        data = {
+            "version": CACHE_VERSION,
+            "devices": {
+                key: {
+                    "fingerprint": list(descriptor.fingerprint),
+                    "info": descriptor.info,
+                    "extended_state": descriptor.extended_state,
+                }
+                for key, descriptor in self._entries.items()
+            },
+        }
+        # note: written to a temporary file first, so a crash never leaves
+        #       a truncated cache behind
+        temporary = self._path.with_name(f"{self._path.name}.tmp")
+        with temporary.open("w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(temporary, self._path)
+
+    async def async_save(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.save)
+
+    def get(self, key: str) -> Optional[Descriptor]:
+        return self._entries.get(key)
+
+    def put(self, key: str, info: dict, extended_state: Optional[dict]) -> None:
+        self._entries[key] = Descriptor(info, extended_state)
+
+    def remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def async_box(
+        self,
+        api_host: ApiHost,
+        *,
+        rate_limits: Optional[RateLimits] = None,
+        hedged: bool = False,
+        **box_kwargs: Any,
+    ) -> Box:
+        """Return box of host, created offline if it's in the cache.
+
+        Box created from cache is revalidated in the background (see
+        revalidation). Otherwise it is created by Box.async_from_host and
+        stored in the cache.
+        """
+        key = self.key(api_host)
+        descriptor = self.get(key)
+        if descriptor is not None:
+            try:
+                box = Box(
+                    api_host,
+                    descriptor.info,
+                    Box._match_device_config(descriptor.info),
+                    descriptor.extended_state,
+                    **box_kwargs,
+                )
+            except error.Error as ex:
+                logger.warning(f"Ignoring cached descriptor of {key}: {ex}")
+                self.remove(key)
+            else:
+                if rate_limits is not None and api_host.rate_limiter is None:
+                    api_host.rate_limiter = rate_limits.bucket(box.type)
+                self._revalidations[key] = asyncio.ensure_future(
+                    self.async_revalidate(box, hedged=hedged)
+                )
+                return box
+
+        box = await Box.async_from_host(
+            api_host, rate_limits=rate_limits, hedged=hedged, **box_kwargs
+        )
+        self.put(key, box.info, box.extended_state)
+        await self.async_save()
+        return box
+
+    def revalidation(self, key: str) -> Optional[asyncio.Task]:
+        """Return task revalidating box created from cache (see async_revalidate)."""
+        return self._revalidations.get(key)
+
+    async def async_revalidate(
+        self, box: Box, hedged: bool = False
+    ) -> Optional[bool]:
+        """Check box created from cache still matches the device.
+
+        Returns False (and drops the cache entry) if device has other
+        fingerprint, so its box has to be created again. Otherwise refreshes
+        the entry with current info of the device and returns
+        True, or None if the device couldn't be reached.
+        """
+        api_host = box._session
+        key = self.key(api_host)
+        try:
+            info = await Box.async_get_info(api_host, hedged=hedged)
+        except error.Error as ex:
+            logger.debug(f"Failed to revalidate descriptor of {key}: {ex}")
+            return None
+        if fingerprint(info) != fingerprint(box.info):
+            logger.warning(
+                f"Device at {key} changed from {fingerprint(box.info)} to"
+                f" {fingerprint(info)}, its box has to be created again"
+            )
+            self.remove(key)
+            await self.async_save()
+            return False
+
+        self.put(key, info, box.extended_state)
+        await self.async_save()
+        return True
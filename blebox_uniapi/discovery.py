@@ -0,0 +1,120 @@
+"""Discovery of BleBox devices among many hosts at once."""
+
+import asyncio
+import ipaddress
+import logging
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, Union
+
+import aiohttp
+
+from .box import Box
+from .pool import ConnectionPool
+from .session import DEFAULT_PORT, ApiHost
+
+DEFAULT_CONCURRENCY = 64
+DEFAULT_CONNECT_TIMEOUT = 1.0
+DEFAULT_READ_TIMEOUT = 5.0
+
+logger = logging.getLogger(__name__)
+
+# host name or address, optionally with port
+Host = Union[str, tuple[str, int]]
+
+
+def hosts_in_network(network: str) -> Iterator[str]:
+    """Return addresses of hosts in network, e.g. ``192.168.1.0/24``."""
+    for address in ipaddress.ip_network(network, strict=False).hosts():
+        yield str(address)
+
+
+class Discovery:
+    """Probes many hosts concurrently and yields boxes of BleBox devices.
+
+    At most ``concurrency`` hosts are probed at once, each with a short
+    connect timeout so unused addresses are skipped quickly. A host is
+    identified as in Box.async_from_host (``/api/device/state`` or ``/info``)
+    and its box is yielded as soon as it's ready, in order of completion.
+
+    Boxes send requests through ``pool`` (a new one if not given), which
+    is closed with the discovery if it was created by it.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[ConnectionPool] = None,
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        **box_kwargs: Any,
+    ):
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        self._own_pool = pool is None
+        self._pool = pool if pool is not None else ConnectionPool(limit=concurrency)
+        self._concurrency = concurrency
+        self._timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        self._box_kwargs = box_kwargs
+        self.probed = 0
+        self.found = 0
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool
+
+    async def close(self) -> None:
+        if self._own_pool:
+            await self._pool.close()
+
+    async def __aenter__(self) -> "Discovery":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def async_discover(self, hosts: Iterable[Host]) -> AsyncIterator[Box]:
+        """Yield boxes of BleBox devices found among hosts."""
+        pending = iter(hosts)
+        found: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        async def probe_next() -> None:
+            # note: hosts are taken one by one, so ranges are never expanded
+            #       upfront and at most `concurrency` probes run at once
+            for host in pending:
+                box = await self._probe(host)
+                if box is not None:
+                    await found.put(box)
+
+        async def probe_all() -> None:
+            try:
+                await asyncio.gather(
+                    *(probe_next() for _ in range(self._concurrency))
+                )
+            finally:
+                await found.put(finished)
+
+        task = asyncio.ensure_future(probe_all())
+        try:
+            while (box := await found.get()) is not finished:
+                yield box
+            await task
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _probe(self, host: Host) -> Optional[Box]:
+        address, port = (host, DEFAULT_PORT) if isinstance(host, str) else host
+        api_host = ApiHost(address, port, self._timeout, None, None, pool=self._pool)
+        self.probed += 1
+        try:
+            box = await Box.async_from_host(api_host, **self._box_kwargs)
+        except Exception as ex:
+            # note: most probed hosts are not BleBox devices at all and fail
+            #       in any way (no connection, other HTTP server, other JSON)
+            logger.debug(f"No BleBox device at {address}:{port}: {ex!r}")
+            return None
+        self.found += 1
+        return box
@@ -13,6 +13,11 @@ class TimeoutError(ConnectionError):
     pass
 
 
+# Requests are not sent until host recovers (see resilience.CircuitBreaker)
+class CircuitOpenError(ConnectionError):
+    pass
+
+
 # Likely unfixable device errors (do not setup)
 class ClientError(Error):
     pass
@@ -103,6 +108,16 @@ class BadFieldNotRGBW(BoxError):
         return f"{self._dev_name}.{self._field} is {self._value} which is not a rgbw string"
 
 
+class BadAccessPath(BoxError):
+    def __init__(self, dev_name: str, field: str, path: str):
+        self._dev_name = dev_name
+        self._field = field
+        self._path = path
+
+    def __str__(self) -> str:
+        return f"{self._dev_name}.{self._field} has invalid access path '{self._path}'"
+
+
 
 # misc errors
 
@@ -1,18 +1,66 @@
-from .error import DeviceStateNotAvailable
-from typing import Any, TYPE_CHECKING, Union
-from blebox_uniapi.jfollow import follow
+import logging
+from functools import partial, wraps
+
+from jmespath.exceptions import JMESPathError
+
+from .coalesce import CommandCoalescer
+from .error import BadAccessPath, DeviceStateNotAvailable
+from typing import Any, Callable, Optional, TYPE_CHECKING, Union
+from blebox_uniapi.jfollow import Extractor, compile_extractor
 
 if TYPE_CHECKING:
     from .box import Box
 
+logger = logging.getLogger(__name__)
+
+
+def synced_property(getter: Callable) -> property:
+    """Property of a feature that is brought up to date before it is read.
+
+    In lazy update mode features only get marked as stale when new state
+    arrives and their attributes are derived on the first read afterwards.
+    """
+
+    @wraps(getter)
+    def wrapper(self: "Feature") -> Any:
+        if self._stale:
+            self.sync()
+        return getter(self)
+
+    return property(wrapper)
+
+
+def _differs(old: Any, new: Any) -> bool:
+    # note: missing sensor readings are reported as NaN which never equals itself
+    return old != new and not (old != old and new != new)
+
 
 class Feature:
     _device_class: str
 
+    # note: features that support lazy updates must read their state
+    # only through synced properties (see synced_property)
+    supports_lazy_update = False
+
+    # names of public properties reported to subscribers when they change
+    state_attributes: tuple[str, ...] = ()
+
+    # commands setting a value (e.g. brightness) of which only the latest one
+    # matters, sent through CommandCoalescer if the box coalesces commands
+    coalesced_commands: tuple[str, ...] = ()
+
     def __init__(self, product: "Box", alias: str, methods: dict):
         self._product = product
         self._alias = alias
+        self._stale = False
+        self._subscribers: list[Callable[["Feature", dict], Any]] = []
+        self._exposed_state: Optional[dict] = None
+        self._coalescers: dict[str, CommandCoalescer] = {}
         self._methods = methods
+        self._access_paths = {
+            name: path for name, path in methods.items() if isinstance(path, str)
+        }
+        self._extractors = self.compile_access_methods(self._access_paths)
 
     @classmethod
     def many_from_config(
@@ -29,6 +77,69 @@ class Feature:
     async def async_update(self) -> None:
         await self._product.async_update_data()
 
+    def handle_update(self) -> None:
+        """Update feature after its state has changed (or mark it stale)."""
+        if self.supports_lazy_update and self._product.lazy_updates:
+            self._stale = True
+        else:
+            self.after_update()
+
+        if self._subscribers:
+            self._notify_changes()
+
+    def subscribe(
+        self, callback: Callable[["Feature", dict], Any]
+    ) -> Callable[[], None]:
+        """Call callback(feature, changes) whenever state attributes change.
+
+        Changes are passed as ``{name: (old_value, new_value)}`` dict. Returns
+        function that cancels the subscription.
+        """
+        if not self._subscribers:
+            self._exposed_state = self._read_exposed_state()
+        self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _read_exposed_state(self) -> dict:
+        return {name: getattr(self, name, None) for name in self.state_attributes}
+
+    def _notify_changes(self) -> None:
+        old_state = self._exposed_state
+        new_state = self._exposed_state = self._read_exposed_state()
+        changes = {
+            name: (old_state.get(name), value)
+            for name, value in new_state.items()
+            if _differs(old_state.get(name), value)
+        }
+        if changes:
+            for callback in list(self._subscribers):
+                # note: failing subscriber must not break updates of the box
+                #       (remaining features) nor notifications of the others
+                try:
+                    callback(self, changes)
+                except Exception:
+                    logger.exception(
+                        f"Subscriber of {self.full_name} failed on {changes}"
+                    )
+
+    def sync(self) -> None:
+        """Run pending lazy update, if any."""
+        if self._stale:
+            # note: cleared upfront as after_update may read synced properties,
+            #       but restored if it fails so every read raises the error
+            #       instead of returning partially updated attributes
+            self._stale = False
+            try:
+                self.after_update()
+            except Exception:
+                self._stale = True
+                raise
+
     @property
     def full_name(self) -> str:
         product = self._product
@@ -46,6 +157,15 @@ class Feature:
     def alias(self):
         return self._alias
 
+    @property
+    def access_paths(self) -> dict[str, str]:
+        """Return resolved access paths of this feature by method name."""
+        return self._access_paths
+
+    @property
+    def extractors(self) -> dict[str, Extractor]:
+        return self._extractors
+
     # TODO: (cleanup) move to product/box ?
     def raw_value(self, name: str) -> Any:
         product = self._product
@@ -53,13 +173,37 @@ class Feature:
         if product.last_data is None:
             # TODO: coverage
             raise DeviceStateNotAvailable  # pragma: no cover
-        methods = self._methods
-        if method := methods.get(name):
-            return follow(product.last_data, method)
+        if extractor := self._extractors.get(name):
+            return product.extract(self._access_paths[name], extractor)
         return None
 
-    async def async_api_command(self, *args: Any, **kwargs: Any) -> None:
-        await self._product.async_api_command(*args, **kwargs)
+    def compile_access_methods(self, paths: dict[str, str]) -> dict[str, Extractor]:
+        """Return dict of compiled extractors for resolved access paths.
+
+        Note: method entries that are still templates (callables not yet resolved
+        with an unit/sensor id) can't be read anyway and should be left out.
+        """
+        extractors = {}
+        for name, path in paths.items():
+            try:
+                extractors[name] = compile_extractor(path)
+            except JMESPathError as ex:
+                field = f"{self._alias}.{name}"
+                raise BadAccessPath(self._product.name, field, path) from ex
+        return extractors
+
+    async def async_api_command(
+        self, command: str, *args: Any, **kwargs: Any
+    ) -> None:
+        if command in self.coalesced_commands and self._product.coalesce_commands:
+            coalescer = self._coalescers.get(command)
+            if coalescer is None:
+                coalescer = self._coalescers[command] = CommandCoalescer(
+                    partial(self._product.async_api_command, command)
+                )
+            await coalescer.submit(*args, **kwargs)
+        else:
+            await self._product.async_api_command(command, *args, **kwargs)
 
     @staticmethod
     def resolve_access_method_paths(
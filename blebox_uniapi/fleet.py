@@ -0,0 +1,220 @@
+"""Polling of many boxes with bounded concurrency."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import random
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+from . import error
+
+DEFAULT_CONCURRENCY = 20
+DEFAULT_INTERVAL = 10.0
+DEFAULT_JITTER = 0.1
+
+logger = logging.getLogger(__name__)
+
+
+class PollStats(NamedTuple):
+    boxes: int
+    in_flight: int
+    polls: int
+    failures: int
+    # polls dropped as these couldn't start before their deadline
+    missed: int
+    # completed polls per second since the fleet was started
+    poll_rate: float
+    # delay (in seconds) of poll start after its scheduled time
+    mean_lag: float
+    max_lag: float
+
+
+class _Entry:
+    def __init__(self, box: Any, interval: float, due: float):
+        self.box = box
+        self.interval = interval
+        self.due = due
+        self.deadline = due + interval
+        self.last_started = -math.inf
+        self.removed = False
+
+
+class Fleet:
+    """Polls state of many boxes, each at its own interval.
+
+    At most ``concurrency`` polls run at once. Polls that are due wait for a
+    free slot in order of their deadlines (scheduled time plus interval) and
+    are dropped (counted as missed) if they can't start before the deadline,
+    as the next poll of the box is due by then anyway. Scheduled times are
+    spread by random ``jitter`` (fraction of interval), first polls over the
+    whole interval, so boxes added together don't poll in sync.
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        interval: float = DEFAULT_INTERVAL,
+        jitter: float = DEFAULT_JITTER,
+        clock: Callable[[], float] = time.monotonic,
+        random: Callable[[], float] = random.random,
+    ):
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        if not 0 <= jitter < 1:
+            raise ValueError(f"jitter must be within 0..1, got {jitter}")
+        self._concurrency = concurrency
+        self._interval = interval
+        self._jitter = jitter
+        self._clock = clock
+        self._random = random
+
+        self._entries: dict[int, _Entry] = {}
+        self._scheduled: list = []
+        self._ready: list = []
+        self._order = itertools.count()
+        self._in_flight: set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self._started: Optional[float] = None
+        self._dispatched = 0
+        self._polls = 0
+        self._failures = 0
+        self._missed = 0
+        self._total_lag = 0.0
+        self._max_lag = 0.0
+
+    def add(self, box: Any, interval: Optional[float] = None) -> None:
+        """Poll box every interval seconds (fleet default if not given)."""
+        if id(box) in self._entries:
+            raise ValueError(f"{box.name} is already in the fleet")
+        interval = self._interval if interval is None else interval
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        entry = _Entry(box, interval, self._clock() + self._random() * interval)
+        self._entries[id(box)] = entry
+        self._schedule(entry)
+
+    def remove(self, box: Any) -> None:
+        entry = self._entries.pop(id(box), None)
+        if entry is not None:
+            entry.removed = True
+
+    @property
+    def boxes(self) -> list:
+        return [entry.box for entry in self._entries.values()]
+
+    def start(self) -> None:
+        if self._task is None:
+            self._started = self._clock()
+            self._task = asyncio.ensure_future(self._dispatch())
+
+    async def stop(self) -> None:
+        tasks = list(self._in_flight)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __aenter__(self) -> "Fleet":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    def stats(self) -> PollStats:
+        elapsed = self._clock() - self._started if self._started is not None else 0
+        return PollStats(
+            boxes=len(self._entries),
+            in_flight=len(self._in_flight),
+            polls=self._polls,
+            failures=self._failures,
+            missed=self._missed,
+            poll_rate=self._polls / elapsed if elapsed > 0 else 0.0,
+            mean_lag=self._total_lag / self._dispatched if self._dispatched else 0.0,
+            max_lag=self._max_lag,
+        )
+
+    def _schedule(self, entry: _Entry) -> None:
+        heapq.heappush(self._scheduled, (entry.due, next(self._order), entry))
+        self._wakeup.set()
+
+    def _reschedule(self, entry: _Entry) -> None:
+        if entry.removed:
+            return
+        spread = 1 + self._jitter * (2 * self._random() - 1)
+        entry.due = max(entry.due + entry.interval * spread, self._clock())
+        entry.deadline = entry.due + entry.interval
+        self._schedule(entry)
+
+    async def _dispatch(self) -> None:
+        while True:
+            now = self._clock()
+            while self._scheduled and self._scheduled[0][0] <= now:
+                _, _, entry = heapq.heappop(self._scheduled)
+                self._make_ready(entry)
+
+            while self._ready and len(self._in_flight) < self._concurrency:
+                _, entry = heapq.heappop(self._ready)
+                if entry.removed:
+                    continue
+                if now > entry.deadline:
+                    # note: polls of the intervals that passed meanwhile are
+                    #       dropped, the one of current interval is still due
+                    missed = max(math.floor((now - entry.due) / entry.interval), 1)
+                    self._missed += missed
+                    entry.due += missed * entry.interval
+                    entry.deadline = entry.due + entry.interval
+                    self._make_ready(entry)
+                    continue
+                self._start_poll(entry, now)
+
+            self._wakeup.clear()
+            timeout = None
+            if self._scheduled and len(self._in_flight) < self._concurrency:
+                timeout = max(self._scheduled[0][0] - now, 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _make_ready(self, entry: _Entry) -> None:
+        # note: of polls with the same deadline, the box polled least recently
+        #       goes first, so slow boxes don't starve the others
+        key = (entry.deadline, entry.last_started, next(self._order))
+        heapq.heappush(self._ready, (key, entry))
+
+    def _start_poll(self, entry: _Entry, now: float) -> None:
+        lag = now - entry.due
+        entry.last_started = now
+        self._dispatched += 1
+        self._total_lag += lag
+        self._max_lag = max(self._max_lag, lag)
+        task = asyncio.ensure_future(self._poll(entry))
+        self._in_flight.add(task)
+
+    async def _poll(self, entry: _Entry) -> None:
+        try:
+            await entry.box.async_update_data()
+        except asyncio.CancelledError:
+            self._in_flight.discard(asyncio.current_task())
+            raise
+        except error.Error as ex:
+            self._failures += 1
+            logger.warning(f"Failed to poll {entry.box.name}: {ex}")
+        except Exception:
+            self._failures += 1
+            logger.exception(f"Failed to poll {entry.box.name}")
+
+        self._in_flight.discard(asyncio.current_task())
+        self._polls += 1
+        self._reschedule(entry)
+        # note: wake up dispatcher waiting for a free slot
+        self._wakeup.set()
@@ -1,11 +1,396 @@
-from typing import Any, Union
+import json
+import re
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, NamedTuple, Optional, Union
 
 import jmespath
+from jmespath.parser import ParsedResult
+
+DEFAULT_CACHE_SIZE = 512
+
+# note: extractors are called with state data and optional StateIndex of it
+Extractor = Callable[..., Any]
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class ExpressionCache:
+    """Bounded LRU cache of compiled JMESPath expressions.
+
+    Access paths come from a small, static set (BOX_TYPE_CONF) so after warm-up
+    every lookup should be a hit. The bound only protects against unbounded
+    growth when paths are generated dynamically (e.g. per sensor id).
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError(f"cache size must be positive, got {maxsize}")
+        self._maxsize = maxsize
+        self._expressions: "OrderedDict[str, ParsedResult]" = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def compile(self, path: str) -> ParsedResult:
+        with self._lock:
+            expression = self._expressions.get(path)
+            if expression is not None:
+                self._expressions.move_to_end(path)
+                self._hits += 1
+                return expression
+
+            self._misses += 1
+            expression = jmespath.compile(path)
+            self._expressions[path] = expression
+            self._evict(self._maxsize)
+            return expression
+
+    def resize(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError(f"cache size must be positive, got {maxsize}")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict(maxsize)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expressions.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._expressions),
+                maxsize=self._maxsize,
+            )
+
+    def _evict(self, maxsize: int) -> None:
+        while len(self._expressions) > maxsize:
+            self._expressions.popitem(last=False)
+            self._evictions += 1
+
+
+_cache = ExpressionCache()
+
+
+def compile_path(path: str) -> ParsedResult:
+    """Return compiled expression for path, reusing process-wide cache."""
+    return _cache.compile(path)
+
+
+# Nearly all paths in BOX_TYPE_CONF have one of a few trivial shapes, e.g.:
+#
+#   thermo.desiredTemp
+#   powerMeasuring.powerConsumption[0]|value
+#   multiSensor.sensors[?id == `1`]|[?type == 'activePower']|[0]|value
+#
+# i.e. pipe-separated stages of field lookups and indexes where a stage may end
+# with a single equality filter. As no projection spans across a stage, such
+# path can be evaluated as a flat sequence of steps with plain dict/list access.
+# Anything else is left to the jmespath interpreter.
+_FIELD = 0
+_INDEX = 1
+_FILTER = 2
+
+_IDENTIFIER = r"[A-Za-z_][A-Za-z0-9_]*"
+_TOKEN_RE = re.compile(
+    rf"""\s*(?:
+        (?P<pipe>\|(?!\|))
+      | (?P<dot>\.)
+      | (?P<field>{_IDENTIFIER})
+      | \[\s*(?P<index>-?\d+)\s*\]
+      | \[\?\s*(?P<key>{_IDENTIFIER})\s*==\s*
+        (?:`(?P<json>[^`\\]*)`|'(?P<raw>[^'\\]*)')\s*\]
+    )\s*""",
+    re.VERBOSE,
+)
+
+
+def _parse_fast_path(path: str) -> Optional[tuple[tuple[int, Any], ...]]:
+    """Return flat sequence of steps for path or None if shape isn't supported."""
+    steps: list[tuple[int, Any]] = []
+    # note: "start" is the beginning of a stage, "field" also covers indexes
+    state = "start"
+    pos = 0
+    while pos < len(path):
+        match = _TOKEN_RE.match(path, pos)
+        if match is None:
+            return None
+        pos = match.end()
+
+        if match["pipe"] is not None:
+            if state in ("start", "dot"):
+                return None
+            state = "start"
+        elif match["dot"] is not None:
+            if state != "field":
+                return None
+            state = "dot"
+        elif match["field"] is not None:
+            if state not in ("start", "dot"):
+                return None
+            steps.append((_FIELD, match["field"]))
+            state = "field"
+        elif match["index"] is not None:
+            if state not in ("start", "field"):
+                return None
+            steps.append((_INDEX, int(match["index"])))
+            state = "field"
+        else:
+            if state not in ("start", "field"):
+                return None
+            if match["raw"] is not None:
+                literal = match["raw"]
+            else:
+                try:
+                    literal = json.loads(match["json"])
+                except ValueError:
+                    return None
+                if not isinstance(literal, (str, int, float, bool, type(None))):
+                    return None
+            steps.append((_FILTER, (match["key"], literal)))
+            # note: filter is a projection so it must be the last step of a stage
+            state = "filter"
+
+    if state in ("start", "dot"):
+        return None
+    return tuple(steps)
+
+
+def _get(value: Any, key: str) -> Any:
+    try:
+        return value.get(key)
+    except AttributeError:
+        return None
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _equals(left: Any, right: Any) -> bool:
+    # note: same as jmespath, 0/1 are not equal to False/True
+    if _is_number(left) and left in (0, 1) and isinstance(right, bool):
+        return False
+    if _is_number(right) and right in (0, 1) and isinstance(left, bool):
+        return False
+    return left == right
+
+
+def _walk(steps: tuple[tuple[int, Any], ...], value: Any) -> Any:
+    for kind, arg in steps:
+        if value is None:
+            return None
+        if kind == _FIELD:
+            value = _get(value, arg)
+        elif kind == _INDEX:
+            if not isinstance(value, list):
+                return None
+            try:
+                value = value[arg]
+            except IndexError:
+                return None
+        else:
+            if not isinstance(value, list):
+                return None
+            key, literal = arg
+            value = [
+                item
+                for item in value
+                if item is not None and _equals(_get(item, key), literal)
+            ]
+    return value
+
+
+# Arrays of sensors/relays that features look up by id/type. Paths filtering
+# them and taking the first match are resolved through StateIndex instead
+# of a linear scan per path.
+INDEXED_ARRAYS = (
+    ("multiSensor", "sensors"),
+    ("sensors",),
+    ("relays",),
+    ("powerMeasuring", "powerConsumption"),
+)
+
+
+def _index_key(value: Any) -> Any:
+    # note: jmespath never considers booleans equal to numbers
+    return (bool, value) if isinstance(value, bool) else value
+
+
+class StateIndex:
+    """Lazily built index over arrays of a single state snapshot.
+
+    For every indexed array and tuple of filtered keys (e.g. ``("id", "type")``)
+    it keeps a dict from key values to the first matching entry, so a path like
+    ``multiSensor.sensors[?id == `1`]|[?type == 'voltage']|[0]|value`` is
+    a dict lookup regardless of the number of sensors.
+    """
+
+    def __init__(self, data: Any):
+        self._data = data
+        self._tables: dict[tuple, dict] = {}
+
+    def first(self, array: tuple[str, ...], keys: tuple[str, ...], values: tuple) -> Any:
+        table = self._tables.get((array, keys))
+        if table is None:
+            table = self._tables[(array, keys)] = self._build(array, keys)
+        return table.get(values)
+
+    def _build(self, array: tuple[str, ...], keys: tuple[str, ...]) -> dict:
+        table: dict = {}
+        items = _walk(tuple((_FIELD, name) for name in array), self._data)
+        if not isinstance(items, list):
+            return table
+
+        for item in items:
+            if item is None:
+                continue
+            key = tuple(_index_key(_get(item, name)) for name in keys)
+            try:
+                table.setdefault(key, item)
+            except TypeError:
+                # note: unhashable values never equal a scalar filter literal
+                continue
+        return table
+
+
+def _fast_extractor(steps: tuple[tuple[int, Any], ...]) -> Extractor:
+    def extract(data: Any, index: Optional[StateIndex] = None) -> Any:
+        return _walk(steps, data)
+
+    return extract
+
+
+def _indexed_extractor(steps: tuple[tuple[int, Any], ...]) -> Optional[Extractor]:
+    """Return extractor using StateIndex if path is a lookup in indexed array."""
+    for array in INDEXED_ARRAYS:
+        if steps[: len(array)] == tuple((_FIELD, name) for name in array):
+            break
+    else:
+        return None
+
+    position = len(array)
+    filters = []
+    while position < len(steps) and steps[position][0] == _FILTER:
+        filters.append(steps[position][1])
+        position += 1
+    if not filters or steps[position : position + 1] != ((_INDEX, 0),):
+        return None
+
+    keys = tuple(key for key, _ in filters)
+    values = tuple(_index_key(literal) for _, literal in filters)
+    rest = steps[position + 1 :]
+
+    def extract(data: Any, index: Optional[StateIndex] = None) -> Any:
+        if index is None:
+            return _walk(steps, data)
+        return _walk(rest, index.first(array, keys, values))
+
+    return extract
+
+
+def path_root(path: str) -> Optional[str]:
+    """Return top-level key read by path or None if path may read any data."""
+    steps = _parse_fast_path(path)
+    if steps and steps[0][0] == _FIELD:
+        return steps[0][1]
+    return None
+
+
+def compile_extractor(path: str) -> Extractor:
+    """Return ready-to-run callable that reads value of path from state data.
+
+    Simple paths are evaluated with plain dict/list access (or StateIndex
+    lookups if one is passed), other ones with the (cached) jmespath
+    expression. Raises jmespath's ParseError (or LexerError) if path is
+    malformed.
+    """
+    if (steps := _parse_fast_path(path)) is not None:
+        return _indexed_extractor(steps) or _fast_extractor(steps)
+
+    expression = compile_path(path)
+
+    def extract(data: Any, index: Optional[StateIndex] = None) -> Any:
+        return expression.search(data)
+
+    return extract
+
+
+def cache_stats() -> CacheStats:
+    """Return hit/miss/eviction counters of the process-wide expression cache."""
+    return _cache.stats()
+
+
+def resize_cache(maxsize: int) -> None:
+    _cache.resize(maxsize)
+
+
+def clear_cache() -> None:
+    _cache.clear()
+
+
+class ExtractionPlan:
+    """Unique access paths of all features of a box, evaluated in one pass.
+
+    Many features read the same paths (and each feature reads its paths several
+    times per update), so the box evaluates every distinct path once per state
+    snapshot and lets features read the precomputed values.
+    """
+
+    def __init__(self) -> None:
+        self._extractors: dict[str, Extractor] = {}
+        self._roots: dict[str, Optional[str]] = {}
+
+    def add(self, path: str, extractor: Extractor) -> None:
+        if path not in self._extractors:
+            self._extractors[path] = extractor
+            self._roots[path] = path_root(path)
+
+    @property
+    def paths(self) -> list[str]:
+        return list(self._extractors)
+
+    def __len__(self) -> int:
+        return len(self._extractors)
+
+    def evaluate(
+        self,
+        data: Any,
+        index: Optional[StateIndex] = None,
+        roots: Optional[set] = None,
+    ) -> dict[str, Any]:
+        """Return values of all paths or only of these under given top-level keys."""
+        if data is None:
+            return {}
+        if roots is None:
+            return {
+                path: extract(data, index)
+                for path, extract in self._extractors.items()
+            }
+
+        path_roots = self._roots
+        return {
+            path: extract(data, index)
+            for path, extract in self._extractors.items()
+            if path_roots[path] is None or path_roots[path] in roots
+        }
 
 
 def follow(data: Union[dict, list], path: str) -> Any:
     if data is None:
         raise RuntimeError(f"bad argument: data {data}")  # pragma: no cover
 
-    expression = jmespath.compile(path)
+    expression = compile_path(path)
     return expression.search(data)
@@ -1,5 +1,5 @@
 from enum import IntEnum
-from .feature import Feature
+from .feature import Feature, synced_property
 from typing import TYPE_CHECKING, Optional, Dict, Any, Union, Sequence
 
 if TYPE_CHECKING:
@@ -35,6 +35,10 @@ BLEBOX_COLOR_MODES = BleboxColorMode.invert()
 
 
 class Light(Feature):
+    supports_lazy_update = True
+    state_attributes = ("is_on", "effect", "rgbw_hex", "white_value")
+    coalesced_commands = ("set",)
+
     # TODO: better defaults?
     CURRENT_CONF = dict()
     CONFIG = {
@@ -119,8 +123,11 @@ class Light(Feature):
         self.desired_color = desired_color
         self._color_mode = color_mode
         self._effect_list = effect_list
-        if self._effect_list is not None:
-            self._effect = current_effect
+        self._desired_raw = None
+        self._desired = None
+        self._is_on = None
+        self._white_value = None
+        self._effect = current_effect if self._effect_list is not None else None
 
         if extended_state not in [None, {}]:
             self.extended_state = extended_state
@@ -235,7 +242,7 @@ class Light(Feature):
         else:
             return []
 
-    @property
+    @synced_property
     def brightness(self) -> Optional[int]:
         if self.color_mode in [6, 5]:
             _, bgt = self.color_temp_brightness_int_from_hex(self._desired)
@@ -254,7 +261,7 @@ class Light(Feature):
         else:
             return []
 
-    @property
+    @synced_property
     def color_temp(self):
         ct, _ = self.color_temp_brightness_int_from_hex(self._desired)
         return ct
@@ -315,7 +322,7 @@ class Light(Feature):
     def supports_white(self) -> Any:
         return self.CURRENT_CONF["white?"]
 
-    @property
+    @synced_property
     def white_value(self) -> Optional[int]:
         return self._white_value
 
@@ -413,11 +420,11 @@ class Light(Feature):
             return [255] * len(elements)
         return list(map(lambda x: round(x * 255 / max_val), elements))
 
-    @property
+    @synced_property
     def is_on(self) -> Optional[bool]:
         return self._is_on
 
-    @property
+    @synced_property
     def effect(self) -> Optional[str]:
         if isinstance(self._effect_list, dict):
             return self._effect_list.get(str(self._effect))
@@ -498,7 +505,7 @@ class Light(Feature):
                 self._white_value = int(raw[6:8], 16)
         return raw
 
-    @property
+    @synced_property
     def sensible_on_value(self) -> Any:
         """Return sensible on value in hass format."""
         if self.mask is not None:
@@ -531,7 +538,7 @@ class Light(Feature):
             else:
                 return self._last_on_state
 
-    @property
+    @synced_property
     def rgb_hex(self) -> Any:
         """Return hex str representing rgb."""
         if isinstance(self._desired, int):
@@ -539,11 +546,11 @@ class Light(Feature):
         else:
             return self._desired
 
-    @property
+    @synced_property
     def rgbw_hex(self) -> Any:
         return self._desired
 
-    @property
+    @synced_property
     def rgbww_hex(self) -> Any:
         if len(self._desired) < 10:
             return None
@@ -0,0 +1,158 @@
+import math
+import re
+from bisect import bisect_left
+from collections import Counter, deque
+from typing import NamedTuple, Optional
+
+DEFAULT_WINDOW_SIZE = 100
+
+
+class LatencyWindow:
+    """Latencies (in seconds) of the most recent requests to a host."""
+
+    def __init__(self, size: int = DEFAULT_WINDOW_SIZE):
+        if size < 1:
+            raise ValueError(f"window size must be positive, got {size}")
+        self._samples: deque = deque(maxlen=size)
+
+    def add(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return q-th (0..1) percentile (nearest rank) or None if empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(math.ceil(q * len(ordered)), 1)
+        return ordered[rank - 1]
+
+
+class SkipStats(NamedTuple):
+    total: int
+    skipped: int
+
+    @property
+    def rate(self) -> float:
+        """Fraction (0..1) of skipped items."""
+        return self.skipped / self.total if self.total else 0.0
+
+
+class ProbeTimings(NamedTuple):
+    """Durations (in seconds) of stages of creating a box from its host."""
+
+    info: float
+    extended_state: float
+    total: float
+    # path which device info was taken from
+    info_path: str
+
+
+# note: upper bounds (in seconds) of latency histogram buckets, last bucket
+#       (above 10s) is implicit
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# note: paths beyond the limit of distinct ones are all recorded under this key
+OTHER_PATH = "*"
+DEFAULT_MAX_PATHS = 100
+
+_VALUE_SEGMENT = re.compile(r"-?\d+(\.\d+)?|[0-9a-fA-F]{6,}")
+
+
+def endpoint(path: str) -> str:
+    """Return path with command arguments replaced by ``{}``.
+
+    E.g. ``/s/p/37`` (position of a cover) becomes ``/s/p/{}``, while paths of
+    command names or ids (``/s/p``, ``/s/1``, ``/s/1/0``) are left as they are.
+    """
+    segments = path.split("/")
+    for index in range(len(segments) - 1, 2, -1):
+        command = segments[index - 1]
+        if _VALUE_SEGMENT.fullmatch(segments[index]) and not _VALUE_SEGMENT.fullmatch(
+            command
+        ):
+            segments[index] = "{}"
+    return "/".join(segments)
+
+
+class LatencyHistogram:
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self._bounds = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._sum = 0.0
+
+    def add(self, latency: float) -> None:
+        self._counts[bisect_left(self._bounds, latency)] += 1
+        self._sum += latency
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def export(self) -> dict:
+        """Return cumulative bucket counts (Prometheus style), sum and count."""
+        buckets = {}
+        total = 0
+        for bound, count in zip(self._bounds + (math.inf,), self._counts):
+            total += count
+            buckets["+Inf" if bound == math.inf else str(bound)] = total
+        return {"buckets": buckets, "sum": self._sum, "count": total}
+
+
+class PathMetrics:
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.latency = LatencyHistogram(buckets)
+        self.errors: Counter = Counter()
+
+    def export(self) -> dict:
+        return {
+            "requests": self.latency.count,
+            "errors": dict(self.errors),
+            "latency": self.latency.export(),
+        }
+
+
+class RequestMetrics:
+    """Latency histograms and error counters of requests by endpoint.
+
+    Requests are grouped by path with command arguments left out (see
+    endpoint) and at most ``max_paths`` distinct ones are kept, the rest is
+    recorded under OTHER_PATH. Errors are counted by name of the error class
+    raised to the caller (e.g. ``TimeoutError``, ``HttpError``). Failed
+    requests are included in latency histograms as well.
+    """
+
+    def __init__(
+        self, buckets: tuple = DEFAULT_BUCKETS, max_paths: int = DEFAULT_MAX_PATHS
+    ):
+        self._buckets = buckets
+        self._max_paths = max_paths
+        self._paths: dict[str, PathMetrics] = {}
+
+    def record(
+        self, path: str, latency: float, error: Optional[BaseException] = None
+    ) -> None:
+        path = endpoint(path)
+        metrics = self._paths.get(path)
+        if metrics is None:
+            if len(self._paths) >= self._max_paths:
+                path = OTHER_PATH
+            metrics = self._paths.get(path)
+        if metrics is None:
+            metrics = self._paths[path] = PathMetrics(self._buckets)
+        metrics.latency.add(latency)
+        if error is not None:
+            metrics.errors[type(error).__name__] += 1
+
+    def paths(self) -> list[str]:
+        return list(self._paths)
+
+    def export(self) -> dict:
+        """Return JSON-serializable metrics of all paths."""
+        return {path: metrics.export() for path, metrics in self._paths.items()}
+
+    def reset(self) -> None:
+        self._paths.clear()
@@ -0,0 +1,107 @@
+"""Poll intervals of boxes derived from state of their features.
+
+All features of a box are updated by a single request, so the box has to be
+polled as often as its most demanding feature needs: often while a cover is
+moving or a light is on, rarely if the box has only temperature or energy
+sensors that change slowly or relays that change only on command (commands
+update the state anyway).
+"""
+
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from . import error
+from .button import Button
+from .cover import BleboxCoverState, Cover
+from .feature import Feature
+from .light import Light
+from .sensor import BaseSensor
+from .switch import Switch
+
+if TYPE_CHECKING:
+    from .box import Box
+
+FAST_INTERVAL = 1.0
+ACTIVE_INTERVAL = 5.0
+DEFAULT_INTERVAL = 10.0
+SLOW_INTERVAL = 60.0
+IDLE_INTERVAL = 300.0
+
+MOVING_STATES = (BleboxCoverState.MOVING_DOWN, BleboxCoverState.MOVING_UP)
+
+
+class PollingPolicy:
+    """Poll intervals (in seconds) of features by their domain and state.
+
+    - ``fast``: moving covers,
+    - ``active``: lights that are on,
+    - ``default``: covers, lights and relays without state yet and features
+      of other domains (e.g. rain or flood sensors),
+    - ``slow``: sensors (temperature, air quality, energy, ...),
+    - ``idle``: covers at rest, lights that are off and relays.
+
+    Buttons need no state at all. Override interval() for other rules.
+    """
+
+    def __init__(
+        self,
+        *,
+        fast: float = FAST_INTERVAL,
+        active: float = ACTIVE_INTERVAL,
+        default: float = DEFAULT_INTERVAL,
+        slow: float = SLOW_INTERVAL,
+        idle: float = IDLE_INTERVAL,
+    ):
+        intervals = {
+            "fast": fast,
+            "active": active,
+            "default": default,
+            "slow": slow,
+            "idle": idle,
+        }
+        for name, interval in intervals.items():
+            if interval <= 0:
+                raise ValueError(f"{name} interval must be positive, got {interval}")
+        self.fast = fast
+        self.active = active
+        self.default = default
+        self.slow = slow
+        self.idle = idle
+
+    def interval(self, feature: Feature) -> Optional[float]:
+        """Return interval feature needs to be polled at, None if at all."""
+        if isinstance(feature, Button):
+            return None
+        try:
+            if isinstance(feature, Cover):
+                return self._cover_interval(feature)
+            if isinstance(feature, Light):
+                return self._on_off_interval(feature.is_on, self.active)
+            if isinstance(feature, Switch):
+                return self._on_off_interval(feature.is_on, self.idle)
+        except error.Error:
+            # note: state of feature failed to update, poll as usual to fix it
+            return self.default
+        if isinstance(feature, BaseSensor):
+            return self.slow
+        return self.default
+
+    def _cover_interval(self, cover: Cover) -> float:
+        state = cover.state
+        if state is None:
+            return self.default
+        return self.fast if state in MOVING_STATES else self.idle
+
+    def _on_off_interval(self, is_on: Optional[bool], when_on: float) -> float:
+        if is_on is None:
+            return self.default
+        return when_on if is_on else self.idle
+
+    def box_interval(self, box: "Box") -> float:
+        """Return interval of the most demanding feature of box."""
+        return self.min_interval(
+            feature for features in box.features.values() for feature in features
+        )
+
+    def min_interval(self, features: Iterable[Feature]) -> float:
+        intervals = (self.interval(feature) for feature in features)
+        return min((i for i in intervals if i is not None), default=self.idle)
@@ -0,0 +1,125 @@
+from collections import Counter
+from typing import Any, NamedTuple, Optional
+
+import aiohttp
+
+DEFAULT_LIMIT = 100
+DEFAULT_LIMIT_PER_HOST = 2
+DEFAULT_KEEPALIVE_TIMEOUT = 30.0
+DEFAULT_DNS_CACHE_TTL = 300
+
+
+class PoolStats(NamedTuple):
+    limit: int
+    limit_per_host: int
+    in_flight: int
+    in_flight_per_host: dict
+    connections_created: int
+    connections_reused: int
+
+
+class ConnectionPool:
+    """HTTP connection pool shared by many ApiHost instances.
+
+    All hosts using the pool share one aiohttp session and connector, so there
+    is a single DNS cache and a global limit of open sockets. Connections are
+    kept alive between polls (one TCP handshake per device instead of one per
+    request) and closed after being idle for ``keepalive_timeout`` seconds.
+
+    Credentials are sent per request (see ApiHost) as the session is shared
+    between devices.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = DEFAULT_LIMIT,
+        limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache: Optional[int] = DEFAULT_DNS_CACHE_TTL,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ):
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._ttl_dns_cache = ttl_dns_cache
+        self._timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self._in_flight: Counter = Counter()
+        self._connections_created = 0
+        self._connections_reused = 0
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Shared session, created on first use (or after the pool was closed)."""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self._limit,
+            limit_per_host=self._limit_per_host,
+            keepalive_timeout=self._keepalive_timeout,
+            ttl_dns_cache=self._ttl_dns_cache,
+        )
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_end.append(self._on_request_done)
+        trace_config.on_request_exception.append(self._on_request_done)
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+
+        kwargs = {}
+        if self._timeout is not None:
+            kwargs["timeout"] = self._timeout
+        return aiohttp.ClientSession(
+            connector=connector, trace_configs=[trace_config], **kwargs
+        )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "ConnectionPool":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def stats(self) -> PoolStats:
+        """Return limits, requests in flight and connection reuse counters."""
+        in_flight_per_host = {
+            host: count for host, count in self._in_flight.items() if count
+        }
+        return PoolStats(
+            limit=self._limit,
+            limit_per_host=self._limit_per_host,
+            in_flight=sum(in_flight_per_host.values()),
+            in_flight_per_host=in_flight_per_host,
+            connections_created=self._connections_created,
+            connections_reused=self._connections_reused,
+        )
+
+    @staticmethod
+    def _host_key(url: Any) -> str:
+        return f"{url.host}:{url.port}"
+
+    async def _on_request_start(self, session: Any, context: Any, params: Any) -> None:
+        self._in_flight[self._host_key(params.url)] += 1
+
+    async def _on_request_done(self, session: Any, context: Any, params: Any) -> None:
+        self._in_flight[self._host_key(params.url)] -= 1
+
+    async def _on_connection_created(
+        self, session: Any, context: Any, params: Any
+    ) -> None:
+        self._connections_created += 1
+
+    async def _on_connection_reused(
+        self, session: Any, context: Any, params: Any
+    ) -> None:
+        self._connections_reused += 1
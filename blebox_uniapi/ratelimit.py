@@ -0,0 +1,163 @@
+"""Pacing of requests sent to devices.
+
+BleBox firmware handles only a few requests per second and may reset when
+flooded. TokenBucket paces requests to a single device (see ApiHost) while
+InFlightGovernor caps requests in flight to all devices at once. Both record
+how long requests waited in their queues.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from .metrics import LatencyHistogram
+
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 5
+DEFAULT_IN_FLIGHT_LIMIT = 50
+
+
+class WaitStats:
+    """Queue waits (in seconds) of acquired tokens or slots."""
+
+    def __init__(self) -> None:
+        self.histogram = LatencyHistogram()
+        self.acquired = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, delayed: bool) -> None:
+        self.acquired += 1
+        if delayed:
+            self.delayed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.histogram.add(wait)
+
+    def export(self) -> dict:
+        return {
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "total_wait": self.total_wait,
+            "max_wait": self.max_wait,
+            "wait": self.histogram.export(),
+        }
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average and ``burst`` at once.
+
+    Callers waiting for a token are served in order of arrival.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        self._rate = rate
+        self._burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+        self.waits = WaitStats()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def burst(self) -> int:
+        return self._burst
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self._tokens + elapsed * self._rate, self._burst)
+
+    async def acquire(self) -> float:
+        """Take a token, waiting for it if needed. Returns wait in seconds."""
+        started = self._clock()
+        delayed = self._lock.locked()
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                delayed = True
+                await self._sleep((1 - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= 1
+        wait = self._clock() - started
+        self.waits.record(wait, delayed)
+        return wait
+
+
+class InFlightGovernor:
+    """Caps number of requests in flight, shared by many ApiHost instances."""
+
+    def __init__(
+        self,
+        limit: int = DEFAULT_IN_FLIGHT_LIMIT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        self._limit = limit
+        self._clock = clock
+        self._semaphore = asyncio.Semaphore(limit)
+        self._in_flight = 0
+        self.waits = WaitStats()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> float:
+        """Take a slot, waiting for it if needed. Returns wait in seconds."""
+        started = self._clock()
+        delayed = self._semaphore.locked()
+        await self._semaphore.acquire()
+        self._in_flight += 1
+        wait = self._clock() - started
+        self.waits.record(wait, delayed)
+        return wait
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._semaphore.release()
+
+
+class RateLimits:
+    """Token bucket parameters (requests per second, burst) by device type.
+
+    E.g. ``RateLimits(per_type={"tempSensor": (1, 2)})`` paces temperature
+    sensors to a request per second and all other devices to the default.
+    """
+
+    def __init__(
+        self,
+        default: tuple[float, int] = (DEFAULT_RATE, DEFAULT_BURST),
+        per_type: Optional[dict[str, tuple[float, int]]] = None,
+    ):
+        self._default = default
+        self._per_type = dict(per_type or {})
+
+    def limits(self, device_type: str) -> tuple[float, int]:
+        return self._per_type.get(device_type, self._default)
+
+    def bucket(self, device_type: str) -> TokenBucket:
+        rate, burst = self.limits(device_type)
+        return TokenBucket(rate, burst)
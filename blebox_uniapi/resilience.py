@@ -0,0 +1,161 @@
+import logging
+import random
+import time
+from collections import Counter
+from enum import Enum
+from typing import Callable, Iterator, NamedTuple, Optional
+
+from . import error
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter for retrying idempotent requests.
+
+    Delay before n-th retry is ``base_delay * multiplier ** (n - 1)`` capped at
+    ``max_delay`` and reduced by random fraction of up to ``jitter`` so polls
+    of many devices failing at once don't retry in lockstep.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.5,
+        random: Callable[[], float] = random.random,
+    ):
+        if attempts < 1:
+            raise ValueError(f"attempts must be positive, got {attempts}")
+        if not 0 <= jitter <= 1:
+            raise ValueError(f"jitter must be between 0 and 1, got {jitter}")
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._random = random
+
+    def delays(self) -> Iterator[float]:
+        """Yield delay before each retry (attempts - 1 of them)."""
+        for retry in range(self.attempts - 1):
+            delay = min(self.max_delay, self.base_delay * self.multiplier**retry)
+            yield delay * (1 - self.jitter * self._random())
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class BreakerStats(NamedTuple):
+    state: CircuitState
+    failures: int
+    rejected: int
+    transitions: dict
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker: closed -> open -> half-open -> closed.
+
+    After ``failure_threshold`` consecutive connection errors the circuit
+    opens and requests fail fast with error.CircuitOpenError instead of
+    waiting for another timeout. After ``recovery_timeout`` seconds single
+    probe request is let through (half-open): if it succeeds the circuit
+    closes, otherwise it opens again.
+
+    Only connection errors (incl. timeouts) count as failures. Any response,
+    even an HTTP error, means the host is reachable.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold < 1:
+            raise ValueError(
+                f"failure threshold must be positive, got {failure_threshold}"
+            )
+        self._name = name
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._clock = clock
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+        self._rejected = 0
+        self._transitions: Counter = Counter()
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def before_request(self) -> None:
+        """Raise error.CircuitOpenError if request must not be sent now."""
+        if self._state is CircuitState.OPEN:
+            if self._clock() - self._opened_at < self._recovery_timeout:
+                self._reject()
+            self._transition(CircuitState.HALF_OPEN)
+
+        if self._state is CircuitState.HALF_OPEN:
+            # note: only single probe at a time, the rest fails fast
+            if self._probing:
+                self._reject()
+            self._probing = True
+
+    def on_success(self) -> None:
+        self._failures = 0
+        self._probing = False
+        if self._state is not CircuitState.CLOSED:
+            self._transition(CircuitState.CLOSED)
+
+    def on_failure(self) -> None:
+        self._failures += 1
+        self._probing = False
+        if self._state is CircuitState.HALF_OPEN or (
+            self._state is CircuitState.CLOSED
+            and self._failures >= self._failure_threshold
+        ):
+            self._opened_at = self._clock()
+            self._transition(CircuitState.OPEN)
+
+    def on_abort(self) -> None:
+        """Request ended without result (e.g. was cancelled)."""
+        self._probing = False
+
+    def stats(self) -> BreakerStats:
+        return BreakerStats(
+            state=self._state,
+            failures=self._failures,
+            rejected=self._rejected,
+            transitions={
+                (old.value, new.value): count
+                for (old, new), count in self._transitions.items()
+            },
+        )
+
+    def _reject(self) -> None:
+        self._rejected += 1
+        raise error.CircuitOpenError(
+            f"Requests to {self._name or 'host'} suspended after"
+            f" {self._failures} consecutive connection failures"
+        )
+
+    def _transition(self, state: CircuitState) -> None:
+        logger.info(
+            "Circuit of %s changed from %s to %s",
+            self._name or "host",
+            self._state.value,
+            state.value,
+        )
+        self._transitions[(self._state, state)] += 1
+        self._state = state
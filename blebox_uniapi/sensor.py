@@ -34,7 +34,8 @@ class SensorFactory:
         """Read potential sensor states from extended state dictionary"""
         # note: probably we should iterate extended state in future if there
         # are other api flavours other than multiSensor that provide sensors
-        states = extended_state.get("multiSensor", {}).get("sensors", [])
+        # note: copy, as extended state is a shared response that must stay intact
+        states = list(extended_state.get("multiSensor", {}).get("sensors", []))
         # note: but for now we are only able to support non-multisensor devices
         # that provide sensor data in extended data payload root
         states.extend(extended_state.get("sensors", []))
@@ -97,6 +98,8 @@ class SensorFactory:
 
 
 class BaseSensor(Feature):
+    state_attributes = ("native_value",)
+
     _unit: str
     _device_class: str
     _native_value: Union[float, int, str]
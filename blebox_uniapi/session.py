@@ -1,10 +1,18 @@
+import hashlib
+from functools import partial
 from typing import Any, Optional, Union
 
 import aiohttp
 import asyncio
 import logging
+import time
 
 from . import error
+from .decoder import DEFAULT_DECODER, Decoder, decode_json
+from .metrics import LatencyWindow, RequestMetrics, SkipStats
+from .pool import ConnectionPool
+from .ratelimit import InFlightGovernor, TokenBucket
+from .resilience import CircuitBreaker, RetryPolicy
 
 DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=5, sock_read=5)
 DEFAULT_PORT = 80
@@ -12,7 +20,57 @@ DEFAULT_PORT = 80
 logger = logging.getLogger(__name__)
 
 
+class AdaptiveTimeout:
+    """Request timeout derived from latency of recent requests to a host.
+
+    Timeout is ``multiplier`` times the ``percentile`` of measured latencies
+    clamped to ``floor``..``ceiling`` seconds. Until ``min_samples`` requests
+    are measured DEFAULT_TIMEOUT is used. Timed out requests are recorded
+    with their (censored) duration, so the timeout grows back if the host
+    gets slower.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.99,
+        multiplier: float = 3.0,
+        floor: float = 1.0,
+        ceiling: float = 5.0,
+        min_samples: int = 20,
+        window: Optional[LatencyWindow] = None,
+    ):
+        self._percentile = percentile
+        self._multiplier = multiplier
+        self._floor = floor
+        self._ceiling = ceiling
+        self._min_samples = min_samples
+        self.latency = window if window is not None else LatencyWindow()
+
+    def record(self, latency: float) -> None:
+        self.latency.add(latency)
+
+    def timeout(self) -> aiohttp.ClientTimeout:
+        if len(self.latency) < self._min_samples:
+            return DEFAULT_TIMEOUT
+        seconds = self._multiplier * self.latency.percentile(self._percentile)
+        seconds = round(min(max(seconds, self._floor), self._ceiling), 3)
+        return aiohttp.ClientTimeout(
+            total=None, sock_connect=seconds, sock_read=seconds
+        )
+
+
 class ApiHost:
+    """HTTP API of a single device.
+
+    Requests are sent with ``session`` which is an aiohttp.ClientSession or
+    any other transport.Transport (e.g. transport.StreamTransport). If no
+    session is given, the one of ``pool`` or a new aiohttp session is used.
+
+    Requests are paced by ``rate_limiter`` (see ratelimit.TokenBucket, may be
+    set later e.g. by Box once device type is known) and ``governor`` shared
+    between hosts caps requests in flight to all of them.
+    """
+
     def __init__(
         self,
         host: str,
@@ -21,41 +79,120 @@ class ApiHost:
         session: Any,
         loop: Any,
         logger: logging.Logger = logger,
+        pool: Optional[ConnectionPool] = None,
+        decoder: Decoder = DEFAULT_DECODER,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        metrics: Optional[RequestMetrics] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        governor: Optional[InFlightGovernor] = None,
         **auth,
     ):
         self._host = host
         self._port = port
+        self._decoder = decoder
+        self._retry = retry
+        self._breaker = breaker
+        self._metrics = metrics if metrics is not None else RequestMetrics()
+        self.rate_limiter = rate_limiter
+        self._governor = governor
         self._username = auth.get("username")
         self._password = auth.get("password")
         # TODO: handle empty logger?
         self._logger = logger
 
-        self._timeout = timeout if timeout else DEFAULT_TIMEOUT
+        # note: explicit timeout overrides timeout adapted to host latency
+        self._timeout = timeout
+        self._adaptive_timeout = None if timeout else AdaptiveTimeout()
 
         self._session = session
+        self._pool = pool
 
         auth = None
 
         if any(data is not None for data in [self._username, self._password]):
             auth = aiohttp.BasicAuth(login=self._username, password=self._password)
 
-        if not self._session:
+        # note: sessions (or transports) not created here, including the one
+        #       shared through the pool, can't have per-device credentials so
+        #       these are sent with every request instead
+        self._request_auth = auth
+        if not self._session and pool is None:
             self._session = aiohttp.ClientSession(loop=loop, timeout=timeout, auth=auth)
+            self._request_auth = None
 
         # TODO: remove?
         self._loop = loop
 
+        self._pending_gets: dict[str, asyncio.Future] = {}
+        # note: digest of last body and its decoded value by path of GET
+        self._last_bodies: dict[str, tuple[bytes, Any]] = {}
+        self._responses = 0
+        self._unchanged_responses = 0
+
     async def async_request(
         self, path: str, async_method: Any, data: Union[dict, str, None] = None
+    ) -> Optional[dict]:
+        # note: time spent waiting for a token or slot is not part of latency
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        governor = self._governor
+        if governor is not None:
+            await governor.acquire()
+
+        started = time.monotonic()
+        try:
+            response = await self._async_guarded_request(path, async_method, data)
+        except error.Error as ex:
+            self._metrics.record(path, time.monotonic() - started, ex)
+            raise
+        finally:
+            if governor is not None:
+                governor.release()
+        self._metrics.record(path, time.monotonic() - started)
+        return response
+
+    async def _async_guarded_request(
+        self, path: str, async_method: Any, data: Union[dict, str, None] = None
+    ) -> Optional[dict]:
+        breaker = self._breaker
+        if breaker is None:
+            return await self._async_request(path, async_method, data)
+
+        breaker.before_request()
+        try:
+            response = await self._async_request(path, async_method, data)
+        except error.ConnectionError:
+            breaker.on_failure()
+            raise
+        except error.Error:
+            # note: any response means the host is reachable
+            breaker.on_success()
+            raise
+        except BaseException:
+            breaker.on_abort()
+            raise
+        breaker.on_success()
+        return response
+
+    async def _async_request(
+        self, path: str, async_method: Any, data: Union[dict, str, None] = None
     ) -> Optional[dict]:
         # TODO: check timeout
-        client_timeout = self._timeout
+        client_timeout = self.timeout
+        adaptive = self._adaptive_timeout
+        started = time.monotonic()
         url = self.api_path(path)
+        kwargs = {}
+        if self._request_auth is not None:
+            kwargs["auth"] = self._request_auth
         try:
             if data is not None:
-                response = await async_method(url, timeout=client_timeout, data=data)
+                response = await async_method(
+                    url, timeout=client_timeout, data=data, **kwargs
+                )
             else:
-                response = await async_method(url, timeout=client_timeout)
+                response = await async_method(url, timeout=client_timeout, **kwargs)
 
             if response.status != 200:
                 if response.status == 401:
@@ -66,9 +203,13 @@ class ApiHost:
                     f"Request to {url} failed with HTTP {response.status}"
                 )
 
-            return await response.json()
+            body = await response.read()
+            if adaptive is not None:
+                adaptive.record(time.monotonic() - started)
 
         except asyncio.TimeoutError as ex:
+            if adaptive is not None:
+                adaptive.record(time.monotonic() - started)
             raise error.TimeoutError(
                 f"Failed to connect to {self.host}:{self.port} within {client_timeout}s: ({ex})"
             ) from ex
@@ -81,17 +222,85 @@ class ApiHost:
         except aiohttp.ClientError as ex:
             raise error.ClientError(f"API request {url} failed: {ex}") from ex
 
-    async def async_api_get(self, path: str) -> Optional[dict]:
+        return self._decode(path, url, body, reuse=data is None)
+
+    def _decode(self, path: str, url: str, body: bytes, reuse: bool) -> Any:
+        # note: most polls of a device in steady state return the same body,
+        #       which is then not decoded again and the previously decoded
+        #       object is returned (so Box can skip the update too)
+        self._responses += 1
+        if reuse:
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            last = self._last_bodies.get(path)
+            if last is not None and last[0] == digest:
+                self._unchanged_responses += 1
+                return last[1]
+
+        # note: body is decoded directly instead of response.json() which
+        #       checks content type and always uses stdlib json module
         try:
-            return await self.async_request(path, self._session.get)
-        except Exception as ex:
-            logger.error(f"EXCEPTION DURING API CALL: {ex}")
-            raise ex
+            decoded = decode_json(body, self._decoder)
+        except ValueError as ex:
+            raise error.ClientError(
+                f"API request {url} returned invalid JSON: {ex}"
+            ) from ex
+        if reuse:
+            self._last_bodies[path] = (digest, decoded)
+        return decoded
+
+    async def async_api_get(
+        self, path: str, *, idempotent: bool = True
+    ) -> Optional[dict]:
+        """Return decoded response of GET request to path.
+
+        Concurrent GETs of the same path share single request (and the same
+        decoded result object, which callers must not modify). Cancelling one
+        of the callers doesn't cancel the request for the others. If the body
+        is identical to the last one of the path, the object decoded from it
+        then is returned again.
+
+        Commands sent as GET requests (e.g. gate pulse ``/s/p``) must pass
+        ``idempotent=False`` so each of them is sent on its own and never
+        retried (a timed out command might have been executed anyway).
+        """
+        if not idempotent:
+            return await self._async_api_get(path, retry=False)
+
+        pending = self._pending_gets.get(path)
+        if pending is None:
+            pending = asyncio.ensure_future(self._async_api_get(path))
+            self._pending_gets[path] = pending
+            pending.add_done_callback(partial(self._get_done, path))
+        return await asyncio.shield(pending)
+
+    def _get_done(self, path: str, pending: asyncio.Future) -> None:
+        if self._pending_gets.get(path) is pending:
+            del self._pending_gets[path]
+        # note: mark exception as retrieved in case all callers were cancelled
+        if not pending.cancelled():
+            pending.exception()
+
+    async def _async_api_get(self, path: str, retry: bool = True) -> Optional[dict]:
+        # note: only reads are retried as commands are not idempotent
+        delays = self._retry.delays() if retry and self._retry else iter(())
+        while True:
+            try:
+                return await self.async_request(path, self.session.get)
+            except error.ConnectionError as ex:
+                delay = next(delays, None)
+                if isinstance(ex, error.CircuitOpenError) or delay is None:
+                    logger.error(f"EXCEPTION DURING API CALL: {ex}")
+                    raise ex
+                self._logger.debug(f"Retrying {path} in {delay:.2f}s: {ex}")
+                await asyncio.sleep(delay)
+            except Exception as ex:
+                logger.error(f"EXCEPTION DURING API CALL: {ex}")
+                raise ex
 
     async def async_api_post(
         self, path: str, data: Union[dict, str, None]
     ) -> Optional[dict]:
-        return await self.async_request(path, self._session.post, data)
+        return await self.async_request(path, self.session.post, data)
 
     def api_path(self, path: str) -> str:
         host = self._host
@@ -100,6 +309,37 @@ class ApiHost:
         # TODO: url lib
         return f"http://{host}:{port}/{path[1:]}"
 
+    @property
+    def session(self) -> Any:
+        """Session (transport) the next request is sent with."""
+        if not self._session and self._pool is not None:
+            return self._pool.session
+        return self._session
+
+    @property
+    def timeout(self) -> Any:
+        """Timeout used for the next request."""
+        if self._adaptive_timeout is not None:
+            return self._adaptive_timeout.timeout()
+        return self._timeout
+
+    @property
+    def latency(self) -> Optional[LatencyWindow]:
+        """Latencies of recent requests, if timeout adapts to them."""
+        if self._adaptive_timeout is not None:
+            return self._adaptive_timeout.latency
+        return None
+
+    @property
+    def unchanged_responses(self) -> SkipStats:
+        """Responses received and those not decoded as identical to last one."""
+        return SkipStats(self._responses, self._unchanged_responses)
+
+    @property
+    def metrics(self) -> RequestMetrics:
+        """Latency histograms and error counters of requests to this host."""
+        return self._metrics
+
     @property
     def logger(self) -> Any:
         return self._logger
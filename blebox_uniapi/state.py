@@ -0,0 +1,68 @@
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+# Number of partial updates kept as separate layers before they get flattened
+MAX_OVERLAYS = 8
+
+
+class LayeredState(Mapping):
+    """Read-only device state made of base snapshot and partial updates on top.
+
+    Devices like switchBoxD respond to commands with partial state. Instead of
+    copying whole state to merge every such response, the response is stacked
+    as an overlay over last full state and layers are flattened only once in
+    a while. Base always holds all top-level keys, so overlays only override.
+    """
+
+    __slots__ = ("_base", "_overlays")
+
+    def __init__(self, base: Mapping, overlays: tuple = ()):
+        self._base = base
+        self._overlays = overlays
+
+    @classmethod
+    def merge(cls, state: Mapping, delta: Mapping) -> "LayeredState":
+        """Return state with delta applied over it, without modifying any of them."""
+        if isinstance(state, LayeredState):
+            base, overlays = state._base, state._overlays
+        else:
+            base, overlays = state, ()
+
+        if len(overlays) >= MAX_OVERLAYS or not delta.keys() <= base.keys():
+            return cls(cls._flatten(base, *overlays, delta))
+        return cls(base, overlays + (delta,))
+
+    @staticmethod
+    def _flatten(*layers: Mapping) -> dict:
+        data: dict = {}
+        for layer in layers:
+            data.update(layer)
+        return data
+
+    def compacted(self) -> dict:
+        """Return state flattened to a plain dict."""
+        return self._flatten(self._base, *self._overlays)
+
+    def __getitem__(self, key: Any) -> Any:
+        for overlay in reversed(self._overlays):
+            if key in overlay:
+                return overlay[key]
+        return self._base[key]
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        for overlay in reversed(self._overlays):
+            if key in overlay:
+                return overlay[key]
+        return self._base.get(key, default)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._base
+
+    def __iter__(self) -> Iterator:
+        return iter(self._base)
+
+    def __len__(self) -> int:
+        return len(self._base)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.compacted()!r})"
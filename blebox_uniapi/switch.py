@@ -6,6 +6,8 @@ if TYPE_CHECKING:
 
 
 class Switch(Feature):
+    state_attributes = ("is_on",)
+
     _is_on: Optional[bool]
 
     def __init__(
@@ -0,0 +1,282 @@
+"""HTTP transports ApiHost can send requests with.
+
+ApiHost uses the subset of ``aiohttp.ClientSession`` interface described by
+Transport, so by default it sends requests with an aiohttp session. BleBox
+devices only speak simple HTTP/1.1 with small JSON bodies, so StreamTransport
+implements just that on top of asyncio streams, with far less overhead per
+request than the full aiohttp client stack.
+"""
+
+import asyncio
+from typing import Any, NamedTuple, Optional, Protocol, Union
+from urllib.parse import urlencode, urlsplit
+
+from . import error
+
+# note: largest accepted response head, device responses are much smaller
+MAX_HEAD_SIZE = 16 * 1024
+
+
+class Response(Protocol):
+    status: int
+
+    async def read(self) -> bytes:
+        """Return whole response body."""
+
+
+class Transport(Protocol):
+    async def get(self, url: str, *, timeout: Any, **kwargs: Any) -> Response:
+        """Send GET request, kwargs may contain ``auth`` (aiohttp.BasicAuth)."""
+
+    async def post(
+        self, url: str, *, timeout: Any, data: Any = None, **kwargs: Any
+    ) -> Response:
+        """Send POST request with data (str or dict) as the body."""
+
+
+class StreamResponse(NamedTuple):
+    status: int
+    headers: dict
+    body: bytes
+
+    async def read(self) -> bytes:
+        return self.body
+
+
+def _timeouts(timeout: Any) -> tuple[Optional[float], Optional[float]]:
+    """Return (connect, read) timeouts from number or aiohttp.ClientTimeout."""
+    if timeout is None or isinstance(timeout, (int, float)):
+        return timeout, timeout
+    connect = timeout.sock_connect or timeout.connect or timeout.total
+    read = timeout.sock_read or timeout.total
+    return connect, read
+
+
+def _encode_body(data: Union[dict, str, bytes, None]) -> tuple[bytes, Optional[str]]:
+    # note: same encoding and content types as aiohttp uses for these
+    if data is None:
+        return b"", None
+    if isinstance(data, dict):
+        return urlencode(data).encode(), "application/x-www-form-urlencoded"
+    if isinstance(data, str):
+        return data.encode("utf-8"), "text/plain; charset=utf-8"
+    return bytes(data), "application/octet-stream"
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @property
+    def usable(self) -> bool:
+        return not (self.reader.at_eof() or self.writer.is_closing())
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class StreamTransport:
+    """Minimal HTTP/1.1 client with keep-alive built on asyncio streams.
+
+    Supports what BleBox devices need: GET and POST of small bodies, responses
+    with Content-Length, chunked or close-delimited bodies. Idle connections
+    are kept per host (up to ``limit_per_host``) and reused by next requests.
+
+    Raises asyncio.TimeoutError on timeouts, error.ConnectionError if host
+    can't be reached and error.ClientError on malformed responses, so ApiHost
+    reports the same errors as with aiohttp.
+    """
+
+    def __init__(self, limit_per_host: int = 2):
+        self._limit_per_host = limit_per_host
+        self._idle: dict[tuple[str, int], list[_Connection]] = {}
+        self.connections_created = 0
+
+    async def get(self, url: str, *, timeout: Any = None, **kwargs: Any) -> StreamResponse:
+        return await self.request("GET", url, timeout=timeout, **kwargs)
+
+    async def post(
+        self, url: str, *, timeout: Any = None, data: Any = None, **kwargs: Any
+    ) -> StreamResponse:
+        return await self.request("POST", url, timeout=timeout, data=data, **kwargs)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        timeout: Any = None,
+        data: Any = None,
+        auth: Any = None,
+    ) -> StreamResponse:
+        parts = urlsplit(url)
+        if parts.scheme != "http" or not parts.hostname:
+            raise error.ClientError(f"Unsupported URL: {url}")
+        key = (parts.hostname, parts.port or 80)
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+
+        body, content_type = _encode_body(data)
+        head = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            "Accept: */*",
+            "Connection: keep-alive",
+        ]
+        if auth is not None:
+            head.append(f"Authorization: {auth.encode()}")
+        if content_type is not None:
+            head.append(f"Content-Type: {content_type}")
+        if body or method == "POST":
+            head.append(f"Content-Length: {len(body)}")
+        message = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+        connect_timeout, read_timeout = _timeouts(timeout)
+        connection = self._idle_connection(key)
+        if connection is not None:
+            try:
+                return await self._send(key, connection, message, read_timeout)
+            except error.ConnectionError:
+                # note: device may have closed idle connection in the meantime,
+                #       but only GET is safe to send again as a POST (command)
+                #       might have been received before the connection broke
+                if method != "GET":
+                    raise
+
+        connection = await self._connect(key, connect_timeout)
+        return await self._send(key, connection, message, read_timeout)
+
+    async def _send(
+        self,
+        key: tuple[str, int],
+        connection: _Connection,
+        message: bytes,
+        timeout: Optional[float],
+    ) -> StreamResponse:
+        try:
+            return await self._exchange(key, connection, message, timeout)
+        except asyncio.TimeoutError:
+            # note: it is an OSError since Python 3.11
+            raise
+        except (OSError, asyncio.IncompleteReadError) as ex:
+            connection.close()
+            raise error.ConnectionError(
+                f"Failed to connect to {key[0]}:{key[1]}: {ex!r}"
+            ) from ex
+
+    def _idle_connection(self, key: tuple[str, int]) -> Optional[_Connection]:
+        idle = self._idle.get(key)
+        while idle:
+            connection = idle.pop()
+            if connection.usable:
+                return connection
+            connection.close()
+        return None
+
+    async def _connect(
+        self, key: tuple[str, int], timeout: Optional[float]
+    ) -> _Connection:
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(*key, limit=MAX_HEAD_SIZE), timeout
+            )
+        except asyncio.TimeoutError:
+            raise
+        except OSError as ex:
+            raise error.ConnectionError(
+                f"Failed to connect to {key[0]}:{key[1]}: {ex}"
+            ) from ex
+        self.connections_created += 1
+        return _Connection(reader, writer)
+
+    async def _exchange(
+        self,
+        key: tuple[str, int],
+        connection: _Connection,
+        message: bytes,
+        timeout: Optional[float],
+    ) -> StreamResponse:
+        connection.writer.write(message)
+        try:
+            status, headers, body = await asyncio.wait_for(
+                self._read_response(connection.reader), timeout
+            )
+        except BaseException:
+            # note: connection in unknown state (e.g. timed out mid-response)
+            connection.close()
+            raise
+
+        reusable = headers.get("connection", "").lower() != "close"
+        idle = self._idle.setdefault(key, [])
+        if reusable and connection.usable and len(idle) < self._limit_per_host:
+            idle.append(connection)
+        else:
+            connection.close()
+        return StreamResponse(status, headers, body)
+
+    async def _read_response(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[int, dict, bytes]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError as ex:
+            raise error.ClientError("Response head too large") from ex
+
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            version, status, *_ = status_line.split(" ", 2)
+            status = int(status)
+        except ValueError as ex:
+            raise error.ClientError(f"Malformed status line: {status_line}") from ex
+
+        headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        if version == "HTTP/1.0" and "keep-alive" not in headers.get(
+            "connection", ""
+        ).lower():
+            headers["connection"] = "close"
+
+        try:
+            if headers.get("transfer-encoding", "").lower() == "chunked":
+                body = await self._read_chunked(reader)
+            elif "content-length" in headers:
+                body = await reader.readexactly(int(headers["content-length"]))
+            elif status in (204, 304) or 100 <= status < 200:
+                body = b""
+            else:
+                headers["connection"] = "close"
+                body = await reader.read()
+        except ValueError as ex:
+            raise error.ClientError(f"Malformed response body: {ex}") from ex
+        return status, headers, body
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        while True:
+            try:
+                size_line = await reader.readuntil(b"\r\n")
+            except asyncio.LimitOverrunError as ex:
+                raise error.ClientError("Chunk size line too long") from ex
+            size = int(size_line.split(b";", 1)[0], 16)
+            if size == 0:
+                # note: skip trailers
+                try:
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                except asyncio.LimitOverrunError as ex:
+                    raise error.ClientError("Chunked trailer too long") from ex
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    async def close(self) -> None:
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.close()
+        self._idle.clear()
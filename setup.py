@@ -12,6 +12,11 @@ with open("HISTORY.rst") as history_file:
 
 requirements = ["aiohttp>=3", "jmespath>1.0.0"]
 
+extras_requirements = {
+    # note: faster JSON decoding of device responses
+    "fast": ["orjson"],
+}
+
 setup_requirements = [
     "pytest-runner",
 ]
@@ -37,6 +42,7 @@ setup(
     ],
     description="Python API for accessing BleBox smart home devices",
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="Apache Software License 2.0",
     long_description=readme + "\n\n" + history,
     long_description_content_type="text/x-rst",
@@ -0,0 +1,36 @@
+"""Recorded device payloads gathered from the integration test suites."""
+
+import json
+
+from . import (
+    test_button,
+    test_climate,
+    test_cover,
+    test_light,
+    test_sensor,
+    test_switch,
+)
+
+RECORDED_MODULES = (
+    test_button,
+    test_climate,
+    test_cover,
+    test_light,
+    test_sensor,
+    test_switch,
+)
+
+
+def recorded_payloads() -> list:
+    """Return unique info/state payloads defined on integration test classes."""
+    payloads = {}
+    for module in RECORDED_MODULES:
+        for klass in vars(module).values():
+            if not isinstance(klass, type):
+                continue
+            for name, value in vars(klass).items():
+                if not name.startswith(("DEVICE_", "STATE_")):
+                    continue
+                if isinstance(value, (dict, list)) and value:
+                    payloads.setdefault(json.dumps(value, sort_keys=True), value)
+    return list(payloads.values())
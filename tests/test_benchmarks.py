@@ -0,0 +1,28 @@
+from blebox_uniapi.box_types import BOX_TYPE_CONF
+
+from benchmarks import bench_box
+from benchmarks.devices import recorded_devices
+
+
+def test_recorded_devices_cover_every_configured_api_level():
+    recorded = {(device.type, device.level) for device in recorded_devices()}
+    configured = {
+        (box_type, level)
+        for box_type, conf_set in BOX_TYPE_CONF.items()
+        for level in conf_set
+    }
+    assert recorded == configured
+
+
+def test_benchmark_runs_for_every_device():
+    results = bench_box.run(number=1)
+
+    for device in recorded_devices():
+        operations = {
+            item.operation
+            for item in results
+            if (item.type, item.level) == (device.type, device.level)
+        }
+        assert {"init", "features", "update", "update_same"} <= operations
+        assert any(name.startswith("after_update:") for name in operations)
+    assert all(item.ops_per_sec > 0 for item in results)
@@ -1,9 +1,14 @@
+import asyncio
+import copy
 import pytest
 from unittest import mock
 from blebox_uniapi.box import Box
 from blebox_uniapi import error
+from blebox_uniapi.feature import Feature
 from blebox_uniapi.jfollow import follow
 
+from benchmarks.devices import recorded_devices
+
 pytestmark = pytest.mark.asyncio
 
 
@@ -29,6 +34,16 @@ def config(sample_data):
     return Box._match_device_config(sample_data)
 
 
+@pytest.fixture
+def make_box(mock_session, sample_data):
+    def make(box_type, api_level, extended_state=None, **kwargs):
+        info = {**sample_data, "type": box_type, "apiLevel": api_level}
+        config = Box._match_device_config(info)
+        return Box(mock_session, info, config, extended_state, **kwargs)
+
+    return make
+
+
 async def test_without_type(mock_session, sample_data, config):
     del sample_data["type"]
 
@@ -167,3 +182,339 @@ async def test_field_validations(mock_session, sample_data, config):
         error.BadFieldNotRGBW, match=r"foobar.field1 is 123 which is not a rgbw string"
     ):
         box.check_rgbw("123", "field1")
+
+
+async def test_malformed_access_path_fails_at_setup(mock_session, sample_data, config):
+    alias, methods = config["sensors"][0]
+    config = {**config, "sensors": [[alias, {**methods, "pm1.value": "air.[?"}]]}
+
+    with pytest.raises(
+        error.BadAccessPath,
+        match=r"foobar.pm1.pm1.value has invalid access path 'air.\[\?'",
+    ):
+        Box(mock_session, sample_data, config, None)
+
+
+async def test_update_evaluates_extraction_plan_once(mock_session, sample_data, config):
+    box = Box(mock_session, sample_data, config, None)
+    # note: airSensor exposes 3 features reading 6 distinct paths
+    assert len(box._plan) == 6
+
+    state = {"air": {"sensors": [{"type": "pm1", "value": 12, "state": 2}]}}
+    with mock.patch("blebox_uniapi.jfollow.ExtractionPlan.evaluate") as evaluate:
+        evaluate.return_value = {"air.sensors[?type == 'pm1']|[0]|value": 7}
+        box._update_last_data(state)
+
+    evaluate.assert_called_once_with(state, box._index)
+    pm1 = box.features["sensors"][0]
+    assert pm1.native_value == 7
+
+
+@pytest.fixture
+def switch_box_d_state():
+    return {
+        "relays": [{"relay": 0, "state": 0}, {"relay": 1, "state": 1}],
+        "powerMeasuring": {
+            "enabled": 1,
+            "powerConsumption": [{"periodS": 86400, "value": 0.5}],
+        },
+        "sensors": [{"type": "activePower", "id": 0, "value": 12}],
+    }
+
+
+@pytest.fixture
+def switch_box_d(make_box, switch_box_d_state):
+    return make_box("switchBoxD", "20200831", switch_box_d_state)
+
+
+async def test_update_dispatches_only_to_features_reading_changed_data(
+    switch_box_d, switch_box_d_state
+):
+    switches = switch_box_d.features["switches"]
+    sensors = switch_box_d.features["sensors"]
+    for feature in switches + sensors:
+        feature.after_update = mock.Mock(wraps=feature.after_update)
+
+    switch_box_d._update_last_data(copy.deepcopy(switch_box_d_state))
+    for feature in switches + sensors:
+        feature.after_update.assert_not_called()
+
+    switch_box_d._update_last_data(
+        {"relays": [{"relay": 0, "state": 1}, {"relay": 1, "state": 1}]}
+    )
+    for feature in switches:
+        feature.after_update.assert_called_once_with()
+    for feature in sensors:
+        feature.after_update.assert_not_called()
+    assert switches[0].is_on is True
+
+
+async def test_partial_update_is_layered_over_last_state(
+    switch_box_d, switch_box_d_state
+):
+    relays = {"relays": [{"relay": 0, "state": 1}, {"relay": 1, "state": 0}]}
+
+    switch_box_d._update_last_data(relays)
+
+    assert switch_box_d.last_data == {**switch_box_d_state, **relays}
+    assert [switch.is_on for switch in switch_box_d.features["switches"]] == [
+        True,
+        False,
+    ]
+    assert switch_box_d.features["sensors"][0].native_value == 12
+
+    switch_box_d._update_last_data(switch_box_d_state)
+    assert switch_box_d.last_data is switch_box_d_state
+
+
+async def test_identical_response_skips_update(switch_box_d, mock_session):
+    features = switch_box_d.features["switches"] + switch_box_d.features["sensors"]
+    response = {"relays": [{"relay": 0, "state": 1}, {"relay": 1, "state": 1}]}
+    switch_box_d._update_last_data(response)
+    for feature in features:
+        feature.after_update = mock.Mock(wraps=feature.after_update)
+
+    # note: ApiHost returns the same object for byte-identical bodies
+    mock_session.async_api_get = mock.AsyncMock(return_value=response)
+    await switch_box_d.async_update_data()
+    for feature in features:
+        feature.after_update.assert_not_called()
+    assert switch_box_d.skipped_updates == (3, 1)
+    # ... and the state is still known to be up to date
+    assert switch_box_d._has_recent_data()
+
+
+async def test_features_failing_to_update_are_updated_again(
+    switch_box_d, switch_box_d_state
+):
+    relays = switch_box_d.features["switches"]
+    relays[0].after_update = mock.Mock(side_effect=ValueError("bad state"))
+    state = {"relays": [{"relay": 0, "state": 1}, {"relay": 1, "state": 0}]}
+
+    with pytest.raises(ValueError, match="bad state"):
+        switch_box_d._update_last_data(state)
+    # note: failure of one feature doesn't leave the others stale
+    assert relays[1].is_on is False
+
+    # ... and is reported again until the device reports valid state
+    with pytest.raises(ValueError, match="bad state"):
+        switch_box_d._update_last_data(copy.deepcopy(state))
+    assert relays[0].after_update.call_count == 2
+
+    relays[0].after_update.side_effect = None
+    switch_box_d._update_last_data(copy.deepcopy(state))
+    switch_box_d._update_last_data(copy.deepcopy(state))
+    assert relays[0].after_update.call_count == 3
+
+
+async def test_lazy_updates_derive_attributes_on_first_read(make_box):
+    box = make_box("dimmerBox", "20170829", lazy_updates=True)
+    light = box.features["lights"][0]
+    light.after_update = mock.Mock(wraps=light.after_update)
+
+    box._update_last_data({"dimmer": {"desiredBrightness": 100}})
+    light.after_update.assert_not_called()
+
+    assert light.is_on is True
+    assert light.brightness == 100
+    light.after_update.assert_called_once_with()
+
+    box._update_last_data({"dimmer": {"desiredBrightness": 0}})
+    assert light.is_on is False
+    assert light.after_update.call_count == 2
+
+
+def _synced_properties(feature: Feature) -> dict:
+    values = {}
+    for klass in type(feature).__mro__:
+        for name, attr in vars(klass).items():
+            if name in values or not hasattr(getattr(attr, "fget", None), "__wrapped__"):
+                continue
+            try:
+                values[name] = getattr(feature, name)
+            except Exception as ex:
+                values[name] = type(ex)
+    return values
+
+
+def _box_properties(box: Box) -> list:
+    return [
+        _synced_properties(feature)
+        for feature_set in box.features.values()
+        for feature in feature_set
+    ]
+
+
+@pytest.mark.parametrize(
+    "device", recorded_devices(), ids=lambda device: f"{device.type}-{device.level}"
+)
+async def test_lazy_updates_match_eager_updates(mock_session, device):
+    config = Box._match_device_config(device.info)
+    boxes = [
+        Box(mock_session, device.info, config, device.extended_state, **kwargs)
+        for kwargs in ({}, {"lazy_updates": True})
+    ]
+    eager, lazy = boxes
+    assert _box_properties(lazy) == _box_properties(eager)
+
+    for state in device.states:
+        for box in boxes:
+            box._update_last_data(copy.deepcopy(state))
+        assert _box_properties(lazy) == _box_properties(eager)
+
+
+async def test_lazy_update_failure_is_raised_on_every_read(make_box):
+    box = make_box("dimmerBox", "20170829", lazy_updates=True)
+    light = box.features["lights"][0]
+
+    box._update_last_data({"dimmer": {"desiredBrightness": "zz"}})
+    for _ in range(2):
+        with pytest.raises(error.BadFieldNotANumber):
+            light.is_on
+
+    box._update_last_data({"dimmer": {"desiredBrightness": 100}})
+    assert light.is_on is True
+
+
+async def test_subscribers_are_notified_only_about_changes(
+    switch_box_d, switch_box_d_state
+):
+    feature_changes = []
+    box_changes = []
+    relay = switch_box_d.features["switches"][0]
+    relay.subscribe(lambda feature, changes: feature_changes.append(changes))
+    unsubscribe = switch_box_d.subscribe(
+        lambda feature, changes: box_changes.append((feature.alias, changes))
+    )
+
+    switch_box_d._update_last_data(copy.deepcopy(switch_box_d_state))
+    assert feature_changes == box_changes == []
+
+    switch_box_d._update_last_data(
+        {"relays": [{"relay": 0, "state": 1}, {"relay": 1, "state": 1}]}
+    )
+    assert feature_changes == [{"is_on": (False, True)}]
+    assert box_changes == [("0.relay_0", {"is_on": (False, True)})]
+
+    unsubscribe()
+    switch_box_d._update_last_data(
+        {"relays": [{"relay": 0, "state": 0}, {"relay": 1, "state": 1}]}
+    )
+    assert len(feature_changes) == 2
+    assert len(box_changes) == 1
+
+
+async def test_failing_subscriber_does_not_break_updates(switch_box_d, caplog):
+    def fail(feature, changes):
+        raise RuntimeError("subscriber failed")
+
+    notified = []
+    switch_box_d.subscribe(fail)
+    switch_box_d.subscribe(lambda feature, changes: notified.append(feature.alias))
+
+    switch_box_d._update_last_data(
+        {"relays": [{"relay": 0, "state": 1}, {"relay": 1, "state": 0}]}
+    )
+    assert [relay.is_on for relay in switch_box_d.features["switches"]] == [
+        True,
+        False,
+    ]
+    assert notified == ["0.relay_0", "0.relay_1"]
+    assert "subscriber failed" in caplog.text
+
+
+async def test_creating_features_does_not_modify_extended_state(make_box):
+    extended_state = {
+        "multiSensor": {"sensors": [{"type": "temperature", "id": 0, "value": 1}]},
+        "sensors": [{"type": "activePower", "id": 0, "value": 12}],
+    }
+    expected = copy.deepcopy(extended_state)
+
+    # note: responses are shared between concurrent callers of the same GET
+    make_box("multiSensor", "20230606", extended_state)
+    assert extended_state == expected
+
+
+async def test_coalesced_commands_send_only_latest_value(make_box, mock_session):
+    box = make_box("dimmerBox", "20170829", coalesce_commands=True)
+    light = box.features["lights"][0]
+
+    release = asyncio.Event()
+    posted = []
+
+    async def post(path, data):
+        posted.append(data)
+        await release.wait()
+        return {"dimmer": {"desiredBrightness": 0}}
+
+    mock_session.async_api_post = post
+    commands = []
+    for value in (10, 20, 30):
+        commands.append(asyncio.ensure_future(light.async_on(value)))
+        await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*commands)
+
+    assert posted == [
+        '{"dimmer":{"desiredBrightness": 10}}',
+        '{"dimmer":{"desiredBrightness": 30}}',
+    ]
+
+
+def probed_host(responses, delays):
+    """Return api host answering paths after their delays (in seconds)."""
+    host = mock.MagicMock(host="172.1.2.3", port=80, rate_limiter=None)
+
+    async def get(path, **kwargs):
+        await asyncio.sleep(delays.get(path, 0))
+        response = responses[path]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    host.async_api_get = mock.AsyncMock(side_effect=get)
+    return host
+
+
+async def test_hedged_probe_does_not_wait_for_state_of_legacy_device(sample_data):
+    host = probed_host(
+        {"/api/device/state": error.HttpError("404"), "/info": sample_data},
+        {"/api/device/state": 0.2},
+    )
+
+    box = await Box.async_from_host(host, hedged=True)
+
+    assert box.info == sample_data
+    timings = box.probe_timings
+    assert timings.info_path == "/info"
+    assert timings.info < 0.1
+    assert timings.total == pytest.approx(timings.info + timings.extended_state)
+
+
+async def test_hedged_probe_prefers_device_state(sample_data):
+    info = {**sample_data, "deviceName": "from /info"}
+    host = probed_host(
+        {"/api/device/state": {"device": sample_data}, "/info": info}, {}
+    )
+
+    box = await Box.async_from_host(host, hedged=True)
+
+    assert box.name == "foobar"
+    assert box.probe_timings.info_path == "/api/device/state"
+
+
+@pytest.mark.parametrize(
+    "state_error, raised",
+    [
+        (error.HttpError("404"), error.ConnectionError),
+        (error.TimeoutError("slow"), error.TimeoutError),
+    ],
+)
+async def test_hedged_probe_raises_as_serial_probe(state_error, raised):
+    host = probed_host(
+        {"/api/device/state": state_error, "/info": error.ConnectionError("down")},
+        {},
+    )
+    for hedged in (False, True):
+        with pytest.raises(raised):
+            await Box.async_get_info(host, hedged=hedged)
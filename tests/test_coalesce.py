@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from blebox_uniapi.coalesce import CommandCoalescer
+
+
+class BlockingSender:
+    def __init__(self):
+        self.sent = []
+        self.release = asyncio.Event()
+        self.error = None
+
+    async def __call__(self, value):
+        self.sent.append(value)
+        await self.release.wait()
+        self.release.clear()
+        if self.error is not None:
+            raise self.error
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_queued_values_are_replaced_by_latest():
+    sender = BlockingSender()
+    coalescer = CommandCoalescer(sender)
+
+    callers = [asyncio.ensure_future(coalescer.submit(0))]
+    await settle()
+    callers += [asyncio.ensure_future(coalescer.submit(value)) for value in range(1, 5)]
+    await settle()
+    assert sender.sent == [0]
+
+    sender.release.set()
+    await settle()
+    # note: first caller's intent is satisfied by the value in flight
+    assert callers[0].done()
+    assert sender.sent == [0, 4]
+    assert not any(caller.done() for caller in callers[1:])
+
+    sender.release.set()
+    await asyncio.gather(*callers)
+    assert (coalescer.sent, coalescer.superseded) == (2, 3)
+
+    sender.release.set()
+    await coalescer.submit(5)  # sent immediately when nothing is in flight
+    assert sender.sent == [0, 4, 5]
+
+
+async def test_failed_send_is_reported_to_all_waiting_callers():
+    sender = BlockingSender()
+    coalescer = CommandCoalescer(sender)
+
+    first = asyncio.ensure_future(coalescer.submit(1))
+    await settle()
+    second = asyncio.ensure_future(coalescer.submit(2))
+    third = asyncio.ensure_future(coalescer.submit(3))
+
+    sender.release.set()
+    await first
+    sender.error = RuntimeError("device busy")
+    sender.release.set()
+    for caller in (second, third):
+        with pytest.raises(RuntimeError, match="device busy"):
+            await caller
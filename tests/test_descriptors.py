@@ -0,0 +1,82 @@
+import json
+from unittest import mock
+
+import pytest
+
+from blebox_uniapi import error
+from blebox_uniapi.descriptors import DescriptorCache
+
+INFO = {
+    "deviceName": "My switchBox",
+    "type": "switchBox",
+    "fv": "0.247",
+    "hv": "0.2",
+    "apiLevel": "20180604",
+    "id": "1afe34e750b8",
+}
+STATE = {"relays": [{"relay": 0, "state": 1, "stateAfterRestart": 0}]}
+
+
+def api_host(info=INFO):
+    host = mock.MagicMock(host="10.0.0.1", port=80, rate_limiter=None)
+    responses = {
+        "/api/device/state": {"device": info},
+        "/info": info,
+        "/api/relay/state": STATE,
+    }
+
+    async def get(path, **kwargs):
+        return responses[path]
+
+    host.async_api_get = mock.AsyncMock(side_effect=get)
+    return host
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "descriptors.json"
+
+
+async def test_box_is_created_offline_from_cache(path):
+    box = await DescriptorCache(path).async_box(api_host())
+    assert json.loads(path.read_text())["devices"]["10.0.0.1:80"]["fingerprint"] == [
+        "switchBox",
+        "20180604",
+        "0.247",
+    ]
+
+    offline = api_host()
+    offline.async_api_get.side_effect = error.ConnectionError("unreachable")
+    cache = DescriptorCache(path)
+    cached = await cache.async_box(offline)
+
+    assert cached.unique_id == box.unique_id
+    assert list(cached.features) == list(box.features)
+    assert cached.info == box.info
+    # note: revalidation fails in background, cached entry is kept
+    assert await cache.revalidation("10.0.0.1:80") is None
+    assert len(DescriptorCache(path)) == 1
+
+
+async def test_cached_box_is_revalidated_in_background(path):
+    await DescriptorCache(path).async_box(api_host())
+
+    cache = DescriptorCache(path)
+    await cache.async_box(api_host(), hedged=True)
+    assert await cache.revalidation("10.0.0.1:80") is True
+
+    # note: firmware upgrade may change API level and so the box config
+    cache = DescriptorCache(path)
+    await cache.async_box(api_host({**INFO, "fv": "0.300"}))
+    assert await cache.revalidation("10.0.0.1:80") is False
+    assert len(DescriptorCache(path)) == 0
+
+
+@pytest.mark.parametrize("content", ["{not json", '{"version": 0, "devices": {}}'])
+async def test_unusable_cache_file_is_ignored(path, content):
+    path.write_text(content)
+    cache = DescriptorCache(path)
+    assert len(cache) == 0
+
+    await cache.async_box(api_host())
+    assert len(DescriptorCache(path)) == 1
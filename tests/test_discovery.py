@@ -0,0 +1,72 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from blebox_uniapi.discovery import Discovery, hosts_in_network
+
+SWITCH_BOX = {
+    "device": {
+        "deviceName": "My switchBox",
+        "type": "switchBox",
+        "fv": "0.247",
+        "hv": "0.2",
+        "apiLevel": "20180604",
+        "id": "1afe34e750b8",
+    }
+}
+
+
+async def serve(routes):
+    def handler(data):
+        async def handle(request):
+            return web.json_response(data)
+
+        return handle
+
+    app = web.Application()
+    for path, data in routes.items():
+        app.router.add_get(path, handler(data))
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    return server
+
+
+@pytest.fixture
+async def servers():
+    started = [
+        await serve({"/api/device/state": SWITCH_BOX, "/api/relay/state": {}}),
+        # note: some other HTTP server
+        await serve({"/": {}}),
+    ]
+    yield started
+    for server in started:
+        await server.close()
+
+
+def test_hosts_in_network():
+    assert list(hosts_in_network("10.0.0.0/30")) == ["10.0.0.1", "10.0.0.2"]
+
+
+async def test_discovery_yields_boxes_of_devices_found(servers):
+    device, other = servers
+    hosts = [("127.0.0.1", device.port), ("127.0.0.1", other.port), ("127.0.0.1", 1)]
+
+    async with Discovery(concurrency=2, connect_timeout=0.5) as discovery:
+        boxes = [box async for box in discovery.async_discover(hosts)]
+
+        assert [box.unique_id for box in boxes] == ["1afe34e750b8"]
+        assert (discovery.probed, discovery.found) == (3, 1)
+        # note: boxes send requests through the pool of discovery
+        assert boxes[0]._session.session is discovery.pool.session
+
+
+async def test_discovery_stops_probing_when_consumer_stops(servers):
+    device, _ = servers
+    hosts = [("127.0.0.1", device.port)] * 5
+
+    async with Discovery(concurrency=1) as discovery:
+        async for _ in discovery.async_discover(hosts):
+            break
+
+    assert discovery.probed < 5
+    assert discovery.pool.stats().limit == 1
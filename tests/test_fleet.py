@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from blebox_uniapi import error
+from blebox_uniapi.fleet import Fleet
+
+
+class FakeBox:
+    def __init__(self, name, duration=0.0, fail=None):
+        self.name = name
+        self.duration = duration
+        self.fail = fail
+        self.polls = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def async_update_data(self):
+        self.polls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.duration)
+        finally:
+            self.running -= 1
+        if self.fail is not None:
+            raise self.fail
+
+
+def no_jitter():
+    # note: first polls are due immediately and intervals are exact
+    return Fleet(jitter=0, random=lambda: 0.0)
+
+
+async def test_fleet_polls_each_box_at_its_interval():
+    fleet = no_jitter()
+    fast, slow = FakeBox("fast"), FakeBox("slow")
+    fleet.add(fast, interval=0.01)
+    fleet.add(slow, interval=0.1)
+
+    async with fleet:
+        await asyncio.sleep(0.15)
+
+    assert slow.polls == 2
+    assert fast.polls >= 5 * slow.polls
+    stats = fleet.stats()
+    assert stats.boxes == 2
+    assert stats.polls == fast.polls + slow.polls
+    assert stats.poll_rate > 0
+    assert stats.in_flight == 0
+
+
+async def test_fleet_limits_concurrent_polls():
+    fleet = Fleet(concurrency=2, interval=1, jitter=0, random=lambda: 0.0)
+    boxes = [FakeBox(f"box{index}", duration=0.02) for index in range(5)]
+    for box in boxes:
+        fleet.add(box)
+
+    async with fleet:
+        await asyncio.sleep(0.01)
+        assert fleet.stats().in_flight == 2
+        await asyncio.sleep(0.1)
+
+    assert all(box.polls == 1 for box in boxes)
+    # note: polls waiting for a free slot started late
+    assert fleet.stats().max_lag >= 0.02
+
+
+async def test_fleet_drops_polls_past_their_deadline():
+    fleet = Fleet(concurrency=1, interval=0.01, jitter=0, random=lambda: 0.0)
+    slow = FakeBox("slow", duration=0.05)
+    other = FakeBox("other")
+    fleet.add(slow)
+    fleet.add(other)
+
+    async with fleet:
+        await asyncio.sleep(0.12)
+
+    stats = fleet.stats()
+    assert stats.missed > 0
+    assert other.polls >= 1
+
+
+async def test_fleet_counts_failures_and_keeps_polling(caplog):
+    fleet = no_jitter()
+    failing = FakeBox("failing", fail=error.ConnectionError("unreachable"))
+    fleet.add(failing, interval=0.01)
+
+    async with fleet:
+        await asyncio.sleep(0.05)
+
+    assert failing.polls >= 2
+    assert fleet.stats().failures == failing.polls
+    assert "unreachable" in caplog.text
+
+
+async def test_fleet_removed_box_is_not_polled_again():
+    fleet = no_jitter()
+    box = FakeBox("box")
+    fleet.add(box, interval=0.01)
+    with pytest.raises(ValueError, match="already"):
+        fleet.add(box)
+
+    async with fleet:
+        await asyncio.sleep(0.005)
+        fleet.remove(box)
+        polls = box.polls
+        await asyncio.sleep(0.03)
+
+    assert box.polls == polls
+    assert fleet.boxes == []
@@ -0,0 +1,225 @@
+import jmespath
+import pytest
+
+from blebox_uniapi import jfollow
+from blebox_uniapi.box_types import BOX_TYPE_CONF
+from blebox_uniapi.jfollow import ExpressionCache, follow
+
+from .payloads import recorded_payloads
+
+
+def test_cache_hits_and_misses():
+    cache = ExpressionCache(maxsize=4)
+
+    first = cache.compile("foo.bar")
+    second = cache.compile("foo.bar")
+
+    assert first is second
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 1, 0, 1)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ExpressionCache(maxsize=2)
+
+    first = cache.compile("a")
+    cache.compile("b")
+    cache.compile("a")  # refresh "a" so "b" becomes the oldest
+    cache.compile("c")
+
+    assert cache.stats().evictions == 1
+    assert cache.compile("a") is first
+    assert cache.stats().misses == 3
+
+    cache.compile("b")
+    assert cache.stats().misses == 4
+
+
+def test_cache_resize_and_clear():
+    cache = ExpressionCache(maxsize=3)
+    for path in ("a", "b", "c"):
+        cache.compile(path)
+
+    cache.resize(1)
+    assert cache.stats().size == 1
+    assert cache.stats().evictions == 2
+
+    cache.clear()
+    assert cache.stats() == (0, 0, 0, 0, 1)
+
+    with pytest.raises(ValueError):
+        cache.resize(0)
+
+
+def test_follow_uses_process_wide_cache():
+    jfollow.clear_cache()
+
+    assert follow({"foo": {"bar": 1}}, "foo.bar") == 1
+    assert follow({"foo": {"bar": 2}}, "foo.bar") == 2
+
+    stats = jfollow.cache_stats()
+    assert stats.misses == 1
+    assert stats.hits == 1
+
+
+def test_extraction_plan_deduplicates_paths():
+    calls = []
+
+    def extractor(data, index=None):
+        calls.append(data)
+        return data["foo"]
+
+    plan = jfollow.ExtractionPlan()
+    plan.add("foo", extractor)
+    plan.add("foo", extractor)
+
+    assert len(plan) == 1
+    assert plan.evaluate({"foo": 3}) == {"foo": 3}
+    assert len(calls) == 1
+    assert plan.evaluate(None) == {}
+
+
+FEATURE_FIELDS = (
+    "covers",
+    "sensors",
+    "binary_sensors",
+    "lights",
+    "climates",
+    "switches",
+    "buttons",
+)
+
+
+def configured_paths():
+    """Return all access paths from BOX_TYPE_CONF with templates materialized."""
+    paths = set()
+
+    def collect(node):
+        if isinstance(node, dict):
+            for value in node.values():
+                # note: tvLiftBox buttons have empty placeholder path
+                if isinstance(value, str) and value:
+                    paths.add(value)
+                elif callable(value):
+                    paths.update(value(unit_id) for unit_id in (0, 1, 2, "0", "1"))
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                collect(item)
+
+    for conf_set in BOX_TYPE_CONF.values():
+        for conf in conf_set.values():
+            for field in FEATURE_FIELDS:
+                collect(conf.get(field, []))
+    return sorted(paths)
+
+
+EDGE_CASE_PAYLOADS = [
+    {},
+    [],
+    {
+        "multiSensor": {
+            "sensors": [
+                None,
+                1,
+                "text",
+                {"id": True, "type": "activePower", "value": 1},
+                {"id": 1, "type": "activePower", "value": 2},
+                {"id": 1.0, "type": "wind", "value": 3},
+                {"id": 0, "value": 0},
+                {"id": 0, "type": "temperature"},
+            ]
+        }
+    },
+    {"multiSensor": {"sensors": {"id": 0, "value": 1}}},
+    {"multiSensor": "sensors"},
+    {"sensors": [{"id": "0", "value": 1}, {"id": False, "value": 2}]},
+    {"relays": [{"relay": False, "state": 1}, {"relay": 1, "state": 0}]},
+    [{"relay": 0, "state": 1}, {"relay": 0, "state": 0}, {"state": 1}],
+    {"powerMeasuring": {"powerConsumption": []}},
+    {"powerMeasuring": {"powerConsumption": {"value": 1}}},
+    {"gateController": {"desiredPos": {"positions": "100"}}},
+    {"thermo": [], "rgbw": "ffffffff", "air": {"sensors": [None]}},
+]
+
+EXTRA_PATHS = [
+    "relays[?relay == `null`]|[0]",
+    "sensors[?id == `1`]|[?type == 'x']|[1]",
+    "sensors[?id == `1`]|[0]|[?type == 'x']",
+    "a[-1]",
+    "a[?x == `null`]|[0]",
+    "a[?x == `1.5`]|[-1]|y",
+    "a[?x == 'with spaces|and pipe']",
+    "a[?x == `true`]",
+    "a[1][0]",
+]
+
+EXTRA_PAYLOADS = [
+    {"relays": [None, 1, {"relay": [0]}, {"relay": 0}]},
+    {"sensors": [{"id": 1, "type": "x"}, {"id": 1.0, "type": "x", "v": 1}]},
+    {"sensors": [[{"type": "x"}], {"id": 1, "type": [1]}, {"id": True, "type": "x"}]},
+    {"a": [{"x": 1.5, "y": 2}, {"x": None}, {"y": 3}, None, {"x": True}]},
+    {"a": [{"x": "with spaces|and pipe"}, {"x": 1}, [[1], [2]]]},
+    {"a": [[0, 1], [2, 3]]},
+]
+
+
+def assert_same_result(path, payload):
+    expected = jmespath.search(path, payload)
+    extractor = jfollow.compile_extractor(path)
+    for actual in (
+        extractor(payload),
+        extractor(payload, jfollow.StateIndex(payload)),
+    ):
+        assert actual == expected and type(actual) is type(expected), (path, payload)
+
+
+@pytest.mark.parametrize("path", configured_paths())
+def test_configured_paths_use_fast_path(path):
+    assert jfollow._parse_fast_path(path) is not None
+
+
+@pytest.mark.parametrize("path", configured_paths())
+def test_fast_path_matches_jmespath_on_recorded_payloads(path):
+    for payload in recorded_payloads() + EDGE_CASE_PAYLOADS:
+        assert_same_result(path, payload)
+
+
+@pytest.mark.parametrize("path", EXTRA_PATHS)
+def test_fast_path_matches_jmespath_on_extra_shapes(path):
+    assert jfollow._parse_fast_path(path) is not None
+    for payload in EXTRA_PAYLOADS + EDGE_CASE_PAYLOADS:
+        assert_same_result(path, payload)
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["[?foo=='3'].value", "a[*].b", "a || b", "length(a)", "a[?x == `2`].b", "a[?x > `1`]"],
+)
+def test_unsupported_shapes_fall_back_to_jmespath(path):
+    assert jfollow._parse_fast_path(path) is None
+    payload = {"a": [{"x": 2, "b": 1}], "foo": 1}
+    assert_same_result(path, payload)
+
+
+def test_state_index_serves_sensor_lookups():
+    payload = {
+        "multiSensor": {
+            "sensors": [
+                {"id": 0, "type": "voltage", "value": 2300},
+                {"id": 0, "type": "current", "value": 150},
+                {"id": 1, "type": "voltage", "value": 2310},
+            ]
+        }
+    }
+    index = jfollow.StateIndex(payload)
+    voltage = jfollow.compile_extractor(
+        "multiSensor.sensors[?id == `1`]|[?type == 'voltage']|[0]|value"
+    )
+    current = jfollow.compile_extractor(
+        "multiSensor.sensors[?id == `0`]|[?type == 'current']|[0]|value"
+    )
+
+    assert voltage(payload, index) == 2310
+    assert current(payload, index) == 150
+    # note: both lookups share single (id, type) table built on first use
+    assert list(index._tables) == [(("multiSensor", "sensors"), ("id", "type"))]
@@ -0,0 +1,81 @@
+import pytest
+
+from blebox_uniapi import error
+from blebox_uniapi.metrics import OTHER_PATH, LatencyWindow, RequestMetrics, endpoint
+
+
+def test_latency_window_percentiles():
+    window = LatencyWindow(size=100)
+    assert window.percentile(0.99) is None
+
+    for latency in range(1, 101):
+        window.add(latency / 1000)
+
+    assert len(window) == 100
+    assert window.percentile(0.5) == 0.05
+    assert window.percentile(0.99) == 0.099
+    assert window.percentile(1) == 0.1
+    assert window.percentile(0) == 0.001
+
+
+def test_latency_window_keeps_most_recent_samples():
+    window = LatencyWindow(size=2)
+    for latency in (5.0, 0.1, 0.2):
+        window.add(latency)
+
+    assert len(window) == 2
+    assert window.percentile(1) == 0.2
+
+    with pytest.raises(ValueError):
+        LatencyWindow(size=0)
+
+
+def test_request_metrics_export():
+    metrics = RequestMetrics(buckets=(0.1, 1.0))
+    metrics.record("/state", 0.05)
+    metrics.record("/state", 0.5, error.TimeoutError("timeout"))
+    metrics.record("/state", 3.0, error.TimeoutError("timeout"))
+
+    assert metrics.paths() == ["/state"]
+    assert metrics.export() == {
+        "/state": {
+            "requests": 3,
+            "errors": {"TimeoutError": 2},
+            "latency": {
+                "buckets": {"0.1": 1, "1.0": 2, "+Inf": 3},
+                "sum": 3.55,
+                "count": 3,
+            },
+        }
+    }
+
+    metrics.reset()
+    assert metrics.export() == {}
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/api/device/state", "/api/device/state"),
+        ("/s/p", "/s/p"),
+        ("/s/1", "/s/1"),
+        ("/s/1/0", "/s/1/0"),
+        ("/s/p/37", "/s/p/{}"),
+        ("/s/t/-150", "/s/t/{}"),
+        ("/s/x/ff00aa10", "/s/x/{}"),
+        ("/s/c/openTv", "/s/c/openTv"),
+    ],
+)
+def test_endpoint_leaves_out_command_arguments(path, expected):
+    assert endpoint(path) == expected
+
+
+def test_request_metrics_paths_are_bounded():
+    metrics = RequestMetrics(max_paths=2)
+    for position in range(100):
+        metrics.record(f"/s/p/{position}", 0.1)
+    metrics.record("/api/device/state", 0.1)
+    metrics.record("/state/extended", 0.1)
+
+    assert metrics.paths() == ["/s/p/{}", "/api/device/state", OTHER_PATH]
+    assert metrics.export()["/s/p/{}"]["requests"] == 100
@@ -0,0 +1,80 @@
+import copy
+from unittest import mock
+
+import pytest
+
+from blebox_uniapi.box import Box
+from blebox_uniapi.polling import PollingPolicy
+
+from benchmarks.devices import recorded_devices
+
+
+@pytest.fixture
+def policy():
+    return PollingPolicy(fast=1, active=5, default=10, slow=60, idle=300)
+
+
+def make_box(box_type, level, policy):
+    (device,) = [
+        device for device in recorded_devices({box_type}) if device.level == level
+    ]
+    config = Box._match_device_config(device.info)
+    box = Box(
+        mock.MagicMock(host="172.1.2.3", port=80),
+        device.info,
+        config,
+        device.extended_state,
+        polling_policy=policy,
+    )
+    return box, device.states
+
+
+@pytest.mark.parametrize(
+    "box_type, level, intervals",
+    [
+        # note: intervals before first update and after each recorded state
+        ("shutterBox", 20180604, [300, 300, 1]),
+        ("dimmerBox", 20170829, [10, 5, 300]),
+        ("switchBox", 20180604, [10, 300, 300]),
+        ("switchBox", 20200831, [60, 60, 60]),
+        ("tempSensor", 20180604, [60, 60, 60]),
+        ("airSensor", 20180403, [60, 60, 60]),
+        ("tvLiftBox", 20200518, [300, 300, 300]),
+    ],
+)
+def test_box_is_polled_as_its_most_demanding_feature_needs(
+    policy, box_type, level, intervals
+):
+    box, states = make_box(box_type, level, policy)
+
+    polled = [box.poll_interval]
+    for state in states:
+        box._update_last_data(copy.deepcopy(state))
+        polled.append(box.poll_interval)
+
+    assert polled == intervals
+
+
+def test_box_without_policy_reuses_recent_data_for_two_seconds():
+    box, _ = make_box("tempSensor", 20180604, None)
+    assert box.poll_interval == 2
+
+
+async def test_policy_interval_replaces_recent_data_window(policy):
+    box, (state, _) = make_box("tempSensor", 20180604, policy)
+    box._session.async_api_get = mock.AsyncMock(return_value=state)
+
+    with mock.patch("blebox_uniapi.box.time.time", return_value=1000.0):
+        await box.async_update_data()
+    with mock.patch("blebox_uniapi.box.time.time", return_value=1059.0):
+        await box.async_update_data()
+    assert box._session.async_api_get.call_count == 1
+
+    with mock.patch("blebox_uniapi.box.time.time", return_value=1061.0):
+        await box.async_update_data()
+    assert box._session.async_api_get.call_count == 2
+
+
+def test_policy_rejects_non_positive_intervals():
+    with pytest.raises(ValueError, match="fast interval"):
+        PollingPolicy(fast=0)
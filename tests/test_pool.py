@@ -0,0 +1,86 @@
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from blebox_uniapi.pool import ConnectionPool
+from blebox_uniapi.session import ApiHost
+
+
+@pytest.fixture
+async def server():
+    requests = []
+
+    async def state(request):
+        requests.append(request)
+        return web.json_response({"relays": [{"relay": 0, "state": 1}]})
+
+    app = web.Application()
+    app.router.add_get("/api/relay/state", state)
+    async with TestServer(app, host="127.0.0.1") as test_server:
+        test_server.requests = requests
+        yield test_server
+
+
+async def test_pool_reuses_connections_between_hosts_and_polls(server):
+    async with ConnectionPool(limit_per_host=1) as pool:
+        first = ApiHost(server.host, server.port, None, None, None, pool=pool)
+        second = ApiHost(server.host, server.port, None, None, None, pool=pool)
+
+        for api_host in (first, second, first):
+            data = await api_host.async_api_get("/api/relay/state")
+            assert data == {"relays": [{"relay": 0, "state": 1}]}
+
+        stats = pool.stats()
+        assert first.session is second.session is pool.session
+        assert stats.connections_created == 1
+        assert stats.connections_reused == 2
+        assert stats.in_flight == 0
+        assert stats.limit_per_host == 1
+
+
+async def test_pool_sends_credentials_per_request(server):
+    async with ConnectionPool() as pool:
+        secured = ApiHost(
+            server.host,
+            server.port,
+            None,
+            None,
+            None,
+            pool=pool,
+            username="admin",
+            password="secret",
+        )
+        anonymous = ApiHost(server.host, server.port, None, None, None, pool=pool)
+
+        await secured.async_api_get("/api/relay/state")
+        await anonymous.async_api_get("/api/relay/state")
+
+    expected = aiohttp.BasicAuth("admin", "secret").encode()
+    assert server.requests[0].headers["Authorization"] == expected
+    assert "Authorization" not in server.requests[1].headers
+
+
+async def test_pool_session_is_recreated_after_close():
+    pool = ConnectionPool(limit=10, limit_per_host=3, keepalive_timeout=5)
+    session = pool.session
+
+    assert session.connector.limit == 10
+    assert session.connector.limit_per_host == 3
+
+    await pool.close()
+    assert session.closed
+    assert pool.session is not session
+    await pool.close()
+
+
+async def test_hosts_use_new_session_after_pool_is_closed(server):
+    pool = ConnectionPool()
+    api_host = ApiHost(server.host, server.port, None, None, None, pool=pool)
+    await api_host.async_api_get("/api/relay/state")
+
+    await pool.close()
+    assert await api_host.async_api_get("/api/relay/state") == {
+        "relays": [{"relay": 0, "state": 1}]
+    }
+    await pool.close()
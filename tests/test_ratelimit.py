@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from blebox_uniapi.box import Box
+from blebox_uniapi.ratelimit import InFlightGovernor, RateLimits, TokenBucket
+from blebox_uniapi.session import ApiHost
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+async def test_token_bucket_allows_burst_then_paces():
+    fake = FakeTime()
+    bucket = TokenBucket(rate=2, burst=2, clock=fake.clock, sleep=fake.sleep)
+
+    waits = [await bucket.acquire() for _ in range(4)]
+    assert waits == [0, 0, 0.5, 0.5]
+
+    fake.now += 10
+    assert await bucket.acquire() == 0
+    assert (bucket.waits.acquired, bucket.waits.delayed) == (5, 2)
+    assert bucket.waits.max_wait == 0.5
+    assert bucket.waits.export()["wait"]["count"] == 5
+
+
+@pytest.mark.parametrize("kwargs", [{"rate": 0}, {"burst": 0}])
+def test_token_bucket_validation(kwargs):
+    with pytest.raises(ValueError):
+        TokenBucket(**kwargs)
+
+
+def test_rate_limits_by_device_type():
+    limits = RateLimits(default=(5, 5), per_type={"tempSensor": (1, 2)})
+
+    bucket = limits.bucket("tempSensor")
+    assert (bucket.rate, bucket.burst) == (1, 2)
+    assert limits.limits("switchBox") == (5, 5)
+
+
+async def test_governor_caps_requests_in_flight_of_all_hosts():
+    governor = InFlightGovernor(limit=2)
+    release = asyncio.Event()
+    in_flight = []
+
+    async def get(url, **kwargs):
+        in_flight.append(governor.in_flight)
+        await release.wait()
+        response = MagicMock(status=200)
+        response.read = AsyncMock(return_value=b"{}")
+        return response
+
+    hosts = []
+    for address in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        session = MagicMock()
+        session.get = get
+        hosts.append(ApiHost(address, 80, 1, session, None, governor=governor))
+
+    requests = [
+        asyncio.ensure_future(api_host.async_api_get("/state")) for api_host in hosts
+    ]
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert in_flight == [1, 2]
+
+    release.set()
+    await asyncio.gather(*requests)
+    assert governor.in_flight == 0
+    assert (governor.waits.acquired, governor.waits.delayed) == (3, 1)
+
+
+async def test_box_from_host_sets_rate_limiter_of_device_type():
+    info = {
+        "id": "abcd1234ef",
+        "type": "tempSensor",
+        "deviceName": "foobar",
+        "fv": "1.23",
+        "hv": "4.56",
+        "apiLevel": "20180604",
+    }
+    api_host = MagicMock(host="10.0.0.1", port=80, rate_limiter=None)
+    api_host.async_api_get = AsyncMock(return_value={"device": info})
+    limits = RateLimits(per_type={"tempSensor": (1, 2)})
+
+    await Box.async_from_host(api_host, rate_limits=limits)
+    assert api_host.rate_limiter.rate == 1
@@ -0,0 +1,95 @@
+import pytest
+
+from blebox_uniapi import error
+from blebox_uniapi.resilience import CircuitBreaker, CircuitState, RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_retry_delays_grow_exponentially_up_to_max():
+    policy = RetryPolicy(
+        attempts=5, base_delay=0.5, max_delay=3, jitter=0, random=lambda: 1
+    )
+    assert list(policy.delays()) == [0.5, 1.0, 2.0, 3]
+
+
+def test_retry_delays_are_jittered():
+    policy = RetryPolicy(attempts=3, base_delay=1, jitter=0.5, random=lambda: 1)
+    assert list(policy.delays()) == [0.5, 1.0]
+
+
+@pytest.mark.parametrize("kwargs", [{"attempts": 0}, {"jitter": 1.5}])
+def test_retry_policy_validation(kwargs):
+    with pytest.raises(ValueError):
+        RetryPolicy(**kwargs)
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("10.0.0.1:80", failure_threshold=2, clock=FakeClock())
+
+    breaker.before_request()
+    breaker.on_failure()
+    breaker.before_request()
+    breaker.on_success()
+    breaker.before_request()
+    breaker.on_failure()
+    assert breaker.state is CircuitState.CLOSED
+
+    breaker.before_request()
+    breaker.on_failure()
+    assert breaker.state is CircuitState.OPEN
+
+    with pytest.raises(error.CircuitOpenError, match="10.0.0.1:80"):
+        breaker.before_request()
+    assert breaker.stats().rejected == 1
+
+
+def test_breaker_probes_single_request_after_recovery_timeout():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=clock)
+    breaker.before_request()
+    breaker.on_failure()
+
+    clock.now += 10
+    breaker.before_request()
+    assert breaker.state is CircuitState.HALF_OPEN
+    with pytest.raises(error.CircuitOpenError):
+        breaker.before_request()
+
+    # note: failed probe opens the circuit for another recovery timeout
+    breaker.on_failure()
+    assert breaker.state is CircuitState.OPEN
+    clock.now += 5
+    with pytest.raises(error.CircuitOpenError):
+        breaker.before_request()
+
+    clock.now += 5
+    breaker.before_request()
+    breaker.on_success()
+    assert breaker.state is CircuitState.CLOSED
+
+    assert breaker.stats().transitions == {
+        ("closed", "open"): 1,
+        ("open", "half_open"): 2,
+        ("half_open", "open"): 1,
+        ("half_open", "closed"): 1,
+    }
+
+
+def test_breaker_releases_probe_of_aborted_request():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=1, clock=clock)
+    breaker.before_request()
+    breaker.on_failure()
+    clock.now += 1
+
+    breaker.before_request()
+    breaker.on_abort()
+    breaker.before_request()
+    assert breaker.state is CircuitState.HALF_OPEN
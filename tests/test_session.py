@@ -1,13 +1,16 @@
 """Tests for `blebox_uniapi` package."""
 
+import asyncio
 import pytest
 import logging
 import aiohttp
 
 from unittest.mock import patch, Mock, AsyncMock
 
-from blebox_uniapi.session import ApiHost as Session
-from blebox_uniapi import error
+from blebox_uniapi.metrics import LatencyWindow
+from blebox_uniapi.session import DEFAULT_TIMEOUT, AdaptiveTimeout, ApiHost as Session
+from blebox_uniapi import decoder, error
+from blebox_uniapi.resilience import CircuitBreaker, RetryPolicy
 
 
 @pytest.fixture
@@ -31,6 +34,7 @@ def valid_response():
     response.status = 200
     response.text = AsyncMock(return_value="foobar")
     response.json = AsyncMock(return_value=123)
+    response.read = AsyncMock(return_value=b"123")
     return response
 
 
@@ -153,3 +157,263 @@ async def test_session_provides_a_logger(logger, client):
     api_session = Session("127.0.0.4", "88", 2, client, None, logger)
     api_session.logger.debug("foobar")
     logger.debug.assert_called_once_with("foobar")
+
+
+def body_response(body):
+    response = Mock(spec_set=aiohttp.ClientResponse)
+    response.status = 200
+    response.read = AsyncMock(return_value=body)
+    return response
+
+
+async def test_session_uses_configured_decoder(logger, client):
+    client.get = AsyncMock(return_value=body_response(b'{"foo": 1}'))
+    decoder = Mock(return_value={"foo": 2})
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger, decoder=decoder)
+
+    assert await api_session.async_api_get("/api/foo") == {"foo": 2}
+    decoder.assert_called_once_with(b'{"foo": 1}')
+
+
+async def test_session_empty_body_decodes_to_none(logger, client):
+    client.post = AsyncMock(return_value=body_response(b""))
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger)
+
+    assert await api_session.async_api_post("/api/foo", {}) is None
+
+
+@pytest.mark.parametrize("decode", [decoder.stdlib_decoder, decoder.DEFAULT_DECODER])
+async def test_session_invalid_json(logger, client, decode):
+    client.get = AsyncMock(return_value=body_response(b"<html>"))
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger, decoder=decode)
+
+    with pytest.raises(error.ClientError, match="returned invalid JSON"):
+        await api_session.async_api_get("/api/foo")
+
+
+async def test_session_reuses_decoded_value_of_unchanged_body(logger, client):
+    client.get = AsyncMock(
+        side_effect=[
+            body_response(b'{"foo": 1}'),
+            body_response(b'{"foo": 1}'),
+            body_response(b'{"foo": 2}'),
+        ]
+    )
+    decode = Mock(side_effect=decoder.stdlib_decoder)
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger, decoder=decode)
+
+    first = await api_session.async_api_get("/api/foo")
+    assert await api_session.async_api_get("/api/foo") is first
+    assert await api_session.async_api_get("/api/foo") == {"foo": 2}
+    assert decode.call_count == 2
+
+    stats = api_session.unchanged_responses
+    assert (stats.total, stats.skipped) == (3, 1)
+    assert stats.rate == pytest.approx(1 / 3)
+
+
+def blocked_get(release, response):
+    async def get(url, **kwargs):
+        await release.wait()
+        return response
+
+    return AsyncMock(side_effect=get)
+
+
+async def test_session_coalesces_concurrent_gets(logger, client):
+    release = asyncio.Event()
+    client.get = blocked_get(release, body_response(b'{"foo": 1}'))
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger)
+
+    first = asyncio.ensure_future(api_session.async_api_get("/api/foo"))
+    second = asyncio.ensure_future(api_session.async_api_get("/api/foo"))
+    other = asyncio.ensure_future(api_session.async_api_get("/api/bar"))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first == {"foo": 1}
+    assert await second is await first
+    assert await other == {"foo": 1}
+    assert client.get.call_count == 2
+
+    # note: finished request is not reused
+    await api_session.async_api_get("/api/foo")
+    assert client.get.call_count == 3
+
+
+async def test_session_does_not_coalesce_get_commands(logger, client):
+    release = asyncio.Event()
+    client.get = blocked_get(release, body_response(b"{}"))
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger)
+
+    pulses = [
+        asyncio.ensure_future(api_session.async_api_get("/s/p", idempotent=False))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*pulses)
+    assert client.get.call_count == 2
+
+
+async def test_session_does_not_coalesce_posts(logger, client):
+    client.post = AsyncMock(return_value=body_response(b"{}"))
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger)
+
+    await asyncio.gather(
+        api_session.async_api_post("/api/foo", {}),
+        api_session.async_api_post("/api/foo", {}),
+    )
+    assert client.post.call_count == 2
+
+
+async def test_session_coalesced_get_errors_and_cancellation(logger, client):
+    release = asyncio.Event()
+    client.get = blocked_get(release, bad_http_response())
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger)
+
+    cancelled = asyncio.ensure_future(api_session.async_api_get("/api/foo"))
+    waiting = asyncio.ensure_future(api_session.async_api_get("/api/foo"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    with pytest.raises(error.HttpError):
+        await waiting
+    assert cancelled.cancelled()
+    assert client.get.call_count == 1
+
+
+async def test_session_retries_get_on_connection_errors(logger, client):
+    client.get = AsyncMock(
+        side_effect=[aiohttp.ServerTimeoutError(), body_response(b"1")]
+    )
+    retry = RetryPolicy(attempts=2, base_delay=0.5, jitter=0)
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger, retry=retry)
+
+    with patch("asyncio.sleep") as sleep:
+        assert await api_session.async_api_get("/api/foo") == 1
+    sleep.assert_called_once_with(0.5)
+
+
+async def test_session_does_not_retry_get_commands(logger, client):
+    client.get = AsyncMock(side_effect=aiohttp.ServerTimeoutError())
+    retry = RetryPolicy(attempts=3, base_delay=0.5, jitter=0)
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger, retry=retry)
+
+    with pytest.raises(error.TimeoutError):
+        await api_session.async_api_get("/s/p", idempotent=False)
+    assert client.get.call_count == 1
+
+
+async def test_session_gives_up_after_retries(logger, client):
+    client.get = AsyncMock(side_effect=os_error)
+    retry = RetryPolicy(attempts=3, jitter=0)
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger, retry=retry)
+
+    with patch("asyncio.sleep"), pytest.raises(error.ConnectionError):
+        await api_session.async_api_get("/api/foo")
+    assert client.get.call_count == 3
+
+
+async def test_session_does_not_retry_posts_and_http_errors(logger, client):
+    client.get = AsyncMock(return_value=bad_http_response())
+    client.post = AsyncMock(side_effect=aiohttp.ServerTimeoutError())
+    retry = RetryPolicy(attempts=3)
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger, retry=retry)
+
+    with pytest.raises(error.HttpError):
+        await api_session.async_api_get("/api/foo")
+    with pytest.raises(error.TimeoutError):
+        await api_session.async_api_post("/api/foo", {})
+    assert client.get.call_count == client.post.call_count == 1
+
+
+async def test_session_circuit_breaker_fails_fast(logger, client):
+    client.get = AsyncMock(side_effect=os_error)
+    breaker = CircuitBreaker(failure_threshold=2)
+    retry = RetryPolicy(attempts=5)
+    api_session = Session(
+        "127.0.0.4", "88", 2, client, None, logger, retry=retry, breaker=breaker
+    )
+
+    with patch("asyncio.sleep"), pytest.raises(error.CircuitOpenError):
+        await api_session.async_api_get("/api/foo")
+    assert client.get.call_count == 2
+
+    client.get = AsyncMock(return_value=bad_http_response())
+    with pytest.raises(error.CircuitOpenError):
+        await api_session.async_api_post("/api/foo", {})
+    assert breaker.stats().transitions == {("closed", "open"): 1}
+
+
+def test_adaptive_timeout_from_latency_percentile():
+    adaptive = AdaptiveTimeout(multiplier=3, floor=0.5, ceiling=2, min_samples=3)
+    for latency in (0.03, 0.04):
+        adaptive.record(latency)
+    assert adaptive.timeout() is DEFAULT_TIMEOUT
+
+    adaptive.record(0.3)
+    assert adaptive.timeout() == aiohttp.ClientTimeout(
+        total=None, sock_connect=0.9, sock_read=0.9
+    )
+
+    # note: window may be shared e.g. to keep latency history of the host
+    window = LatencyWindow()
+    assert AdaptiveTimeout(window=window).latency is window
+
+
+@pytest.mark.parametrize("latencies, expected", [([0.01] * 20, 1.0), ([4] * 20, 5.0)])
+def test_adaptive_timeout_is_clamped(latencies, expected):
+    adaptive = AdaptiveTimeout()
+    for latency in latencies:
+        adaptive.record(latency)
+    assert adaptive.timeout().sock_read == expected
+
+
+async def test_session_adapts_timeout_to_host_latency(logger, client):
+    client.get = AsyncMock(return_value=valid_response())
+    api_session = Session("127.0.0.4", "88", None, client, None, logger)
+
+    for _ in range(21):
+        await api_session.async_api_get("/api/foo")
+
+    assert len(api_session.latency) == 21
+    # note: mocked requests are instant so timeout is at its floor
+    assert api_session.timeout.sock_read == 1.0
+    client.get.assert_called_with(
+        "http://127.0.0.4:88/api/foo", timeout=api_session.timeout
+    )
+
+
+async def test_session_explicit_timeout_is_not_adapted(logger, client):
+    client.get = AsyncMock(return_value=valid_response())
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger)
+
+    await api_session.async_api_get("/api/foo")
+    assert api_session.timeout == 2
+    assert api_session.latency is None
+
+
+async def test_session_records_request_metrics(logger, client):
+    client.get = AsyncMock(
+        side_effect=[valid_response(), bad_http_response(), aiohttp.ClientOSError()]
+    )
+    client.post = AsyncMock(side_effect=aiohttp.ServerTimeoutError())
+    api_session = Session("127.0.0.4", "88", 2, client, None, logger)
+
+    await api_session.async_api_get("/api/foo")
+    for request in (
+        api_session.async_api_get("/api/foo"),
+        api_session.async_api_get("/api/foo"),
+        api_session.async_api_post("/api/bar", {}),
+    ):
+        with pytest.raises(error.Error):
+            await request
+
+    exported = api_session.metrics.export()
+    assert exported["/api/foo"]["requests"] == 3
+    assert exported["/api/foo"]["errors"] == {"HttpError": 1, "ConnectionError": 1}
+    assert exported["/api/bar"]["errors"] == {"TimeoutError": 1}
+    assert exported["/api/foo"]["latency"]["buckets"]["+Inf"] == 3
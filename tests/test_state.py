@@ -0,0 +1,33 @@
+from blebox_uniapi.state import MAX_OVERLAYS, LayeredState
+
+
+def test_merge_stacks_partial_updates_without_copying():
+    base = {"relays": [0], "sensors": [1]}
+    delta = {"relays": [1]}
+
+    state = LayeredState.merge(base, delta)
+
+    assert state["relays"] is delta["relays"]
+    assert state.get("sensors") is base["sensors"]
+    assert state.get("missing", 3) == 3
+    assert state == {"relays": [1], "sensors": [1]}
+    assert base == {"relays": [0], "sensors": [1]}
+    assert len(state) == 2 and "sensors" in state
+
+
+def test_merge_compacts_overlays():
+    state = {"a": 0, "b": 0}
+    for value in range(MAX_OVERLAYS + 1):
+        state = LayeredState.merge(state, {"a": value})
+
+    assert state._overlays == ()
+    assert state.compacted() == {"a": MAX_OVERLAYS, "b": 0}
+
+
+def test_merge_flattens_when_new_key_appears():
+    state = LayeredState.merge({"a": 0}, {"a": 1})
+
+    state = LayeredState.merge(state, {"b": 2})
+
+    assert state._overlays == ()
+    assert dict(state) == {"a": 1, "b": 2}
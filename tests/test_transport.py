@@ -0,0 +1,179 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from blebox_uniapi import error
+from blebox_uniapi.session import ApiHost
+from blebox_uniapi.transport import StreamTransport
+
+
+@pytest.fixture
+async def server():
+    requests = []
+
+    async def state(request):
+        requests.append((request, await request.text()))
+        return web.json_response({"dimmer": {"desiredBrightness": 53}})
+
+    async def chunked(request):
+        response = web.StreamResponse()
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        await response.write(b'{"foo": ')
+        await response.write(b"[1, 2]}")
+        await response.write_eof()
+        return response
+
+    async def unauthorized(request):
+        return web.Response(status=401)
+
+    async def slow(request):
+        await asyncio.sleep(1)
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_get("/api/dimmer/state", state)
+    app.router.add_post("/api/dimmer/set", state)
+    app.router.add_get("/chunked", chunked)
+    app.router.add_get("/unauthorized", unauthorized)
+    app.router.add_get("/slow", slow)
+    async with TestServer(app, host="127.0.0.1") as test_server:
+        test_server.requests = requests
+        yield test_server
+
+
+@pytest.fixture
+async def transport():
+    transport = StreamTransport()
+    yield transport
+    await transport.close()
+
+
+@pytest.fixture
+def api_host(server, transport):
+    return ApiHost(server.host, server.port, 1, transport, None)
+
+
+async def test_stream_transport_get_and_post_over_kept_alive_connection(
+    server, transport, api_host
+):
+    expected = {"dimmer": {"desiredBrightness": 53}}
+    assert await api_host.async_api_get("/api/dimmer/state") == expected
+    post = '{"dimmer":{"desiredBrightness": 10}}'
+    assert await api_host.async_api_post("/api/dimmer/set", post) == expected
+    assert await api_host.async_api_get("/api/dimmer/state") == expected
+
+    assert transport.connections_created == 1
+    request, body = server.requests[1]
+    assert request.method == "POST"
+    assert request.content_type == "text/plain"
+    assert body == post
+
+
+async def test_stream_transport_reads_chunked_body(api_host):
+    assert await api_host.async_api_get("/chunked") == {"foo": [1, 2]}
+
+
+async def test_stream_transport_sends_credentials(server, transport):
+    auth = aiohttp.BasicAuth("admin", "secret")
+    url = f"http://{server.host}:{server.port}/api/dimmer/state"
+
+    await transport.get(url, timeout=1, auth=auth)
+
+    request, _ = server.requests[0]
+    assert request.headers["Authorization"] == auth.encode()
+
+
+async def test_stream_transport_errors(server, api_host):
+    with pytest.raises(error.UnauthorizedRequest):
+        await api_host.async_api_get("/unauthorized")
+
+    api_host = ApiHost(server.host, server.port, 0.1, StreamTransport(), None)
+    with pytest.raises(error.TimeoutError):
+        await api_host.async_api_get("/slow")
+
+
+async def test_stream_transport_connection_refused(transport):
+    api_host = ApiHost("127.0.0.1", 1, 1, transport, None)
+    with pytest.raises(error.ConnectionError, match="127.0.0.1:1"):
+        await api_host.async_api_get("/api/dimmer/state")
+
+
+async def test_stream_transport_reconnects_after_idle_connection_closed(
+    server, transport, api_host
+):
+    await api_host.async_api_get("/api/dimmer/state")
+    for idle in transport._idle.values():
+        for connection in idle:
+            # note: simulate device closing the idle connection
+            connection.writer.transport.abort()
+
+    await asyncio.sleep(0)
+    await api_host.async_api_get("/api/dimmer/state")
+    assert transport.connections_created == 2
+
+
+@pytest.fixture
+async def dropping_server():
+    """Server closing every kept-alive connection on its second request."""
+    requests = []
+    body = b"{}"
+    response = (
+        f"HTTP/1.1 200 OK\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+
+    async def handle(reader, writer):
+        try:
+            for count in range(2):
+                request = await reader.readuntil(b"\r\n\r\n")
+                for line in request.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        await reader.readexactly(int(line.split(b":")[1]))
+                requests.append(request.split(b" ", 1)[0].decode())
+                if count == 0:
+                    writer.write(response)
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    async with server:
+        server.requests = requests
+        server.port = server.sockets[0].getsockname()[1]
+        yield server
+
+
+async def test_stream_transport_resends_only_get_after_reused_connection_failed(
+    dropping_server, transport
+):
+    api_host = ApiHost("127.0.0.1", dropping_server.port, 1, transport, None)
+
+    await api_host.async_api_get("/api/dimmer/state")
+    assert await api_host.async_api_get("/api/dimmer/state") == {}
+    assert dropping_server.requests == ["GET", "GET", "GET"]
+
+    with pytest.raises(error.ConnectionError):
+        await api_host.async_api_post("/api/dimmer/set", "{}")
+    assert dropping_server.requests == ["GET", "GET", "GET", "POST"]
+
+
+async def test_api_host_sends_credentials_with_stream_transport(server, transport):
+    api_host = ApiHost(
+        server.host,
+        server.port,
+        1,
+        transport,
+        None,
+        username="admin",
+        password="secret",
+    )
+
+    await api_host.async_api_get("/api/dimmer/state")
+
+    request, _ = server.requests[0]
+    expected = aiohttp.BasicAuth("admin", "secret").encode()
+    assert request.headers["Authorization"] == expected